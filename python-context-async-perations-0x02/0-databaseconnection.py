@@ -1,4 +1,4 @@
-import sqlite3
+import sqlite_profile
 
 class DatabaseConnection:
     def __init__(self, db_name):
@@ -6,7 +6,7 @@ class DatabaseConnection:
         self.conn = None
         
     def __enter__(self):
-        self.conn = sqlite3.connect(self.db_name)
+        self.conn = sqlite_profile.connect(self.db_name)
         print("Database connection opened.")
         return self.conn
     
@@ -1,4 +1,4 @@
-import sqlite3
+import sqlite_profile
 
 class ExecuteQuery:
     def __init__(self, db_name, query, params):
@@ -10,7 +10,7 @@ class ExecuteQuery:
         self.result = None
         
     def __enter__(self):
-        self.conn = sqlite3.connect(self.db_name)
+        self.conn = sqlite_profile.connect(self.db_name)
         self.cursor = self.conn.cursor()
         
         try:
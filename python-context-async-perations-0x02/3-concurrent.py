@@ -1,14 +1,15 @@
 import asyncio
-import aiosqlite
+
+import sqlite_profile
 
 async def async_fetch_users():
-    async with aiosqlite.connect("users.db") as db:
+    async with sqlite_profile.aconnect("users.db") as db:
         async with db.execute("SELECT * FROM users") as cursor:
             users = await cursor.fetchall()
             return users
         
 async def async_fetch_older_users():
-    async with aiosqlite.connect("users.db") as db:
+    async with sqlite_profile.aconnect("users.db") as db:
         async with db.execute("SELECT * FROM users WHERE age > ?", (40,)) as cursor:
             users = await cursor.fetchall()
             print("All users older than 40:")
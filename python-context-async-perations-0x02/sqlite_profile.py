@@ -0,0 +1,144 @@
+import contextlib
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import warnings
+
+# Per-connection pragmas applied by the tuned profile to every connection
+TUNED_PRAGMAS = {
+    'synchronous': 'NORMAL',        # in WAL mode: fsync at checkpoints, not every commit
+    'mmap_size': 256 * 1024 * 1024, # read pages straight from the OS page cache
+    'cache_size': -64 * 1024,       # negative = KiB, so 64 MB of page cache
+    'temp_store': 'MEMORY',         # sorts and temp tables stay in RAM
+}
+CACHED_STATEMENTS = 256             # prepared statements kept per connection (default 128)
+
+# journal_mode is stored in the database file, so it is set once per
+# database per process rather than on every connect
+JOURNAL_MODES = {'tuned': 'wal', 'default': 'delete'}
+
+# SQLITE_PROFILE=default in the environment, or use_profile('default'),
+# switches every helper back to stock sqlite3 behaviour
+PROFILES = ('tuned', 'default')
+current_profile = os.environ.get('SQLITE_PROFILE', 'tuned')
+
+_configured = set()
+_lock = threading.Lock()
+
+def use_profile(name):
+    global current_profile
+    if name not in PROFILES:
+        raise ValueError(f"Unknown SQLite profile {name!r}")
+    current_profile = name
+
+def configure_database(db_path='users.db', profile=None):
+    # Put the database file in the profile's journal mode. Runs once per
+    # database per process; warns if the mode could not be changed, e.g.
+    # leaving WAL while another process has the file open.
+    name = profile or current_profile
+    if name not in PROFILES:
+        raise ValueError(f"Unknown SQLite profile {name!r}")
+    key = (os.path.abspath(db_path), name)
+    with _lock:
+        if key in _configured:
+            return
+        _configured.add(key)
+    wanted = JOURNAL_MODES[name]
+    conn = sqlite3.connect(db_path)
+    try:
+        mode = conn.execute(f"PRAGMA journal_mode={wanted}").fetchone()[0]
+    except sqlite3.OperationalError as e:
+        mode = f"unchanged ({e})"
+    finally:
+        conn.close()
+    if mode != wanted:
+        warnings.warn(f"{db_path}: could not set journal_mode={wanted}, it is {mode}",
+                      RuntimeWarning, stacklevel=3)
+
+def connect(db_path='users.db', profile=None, **kwargs):
+    # sqlite3.connect with the active profile applied. Opening a WAL database
+    # costs more than a rollback-journal one, so hot connect-per-call paths
+    # should borrow from a pool (with_pooled_connection) instead.
+    name = profile or current_profile
+    configure_database(db_path, name)
+    if name == 'default':
+        return sqlite3.connect(db_path, **kwargs)
+    conn = sqlite3.connect(db_path, cached_statements=CACHED_STATEMENTS, **kwargs)
+    for pragma, value in TUNED_PRAGMAS.items():
+        conn.execute(f"PRAGMA {pragma}={value}")
+    return conn
+
+@contextlib.asynccontextmanager
+async def aconnect(db_path='users.db', profile=None, **kwargs):
+    # aiosqlite counterpart of connect(): async with aconnect() as conn
+    import aiosqlite
+    name = profile or current_profile
+    configure_database(db_path, name)
+    if name == 'default':
+        async with aiosqlite.connect(db_path, **kwargs) as conn:
+            yield conn
+        return
+    async with aiosqlite.connect(db_path, cached_statements=CACHED_STATEMENTS,
+                                 **kwargs) as conn:
+        for pragma, value in TUNED_PRAGMAS.items():
+            await conn.execute(f"PRAGMA {pragma}={value}")
+        yield conn
+
+def benchmark(rows=20000, writes=2000, reads=20000, scans=400):
+    # Committed single-row inserts, point reads by id, age-filtered scans and
+    # connect-query-close round trips against a fresh users table, per profile
+    directory = tempfile.mkdtemp()
+    results = {}
+    try:
+        for name in PROFILES:
+            db_path = os.path.join(directory, f"{name}.db")
+            conn = connect(db_path, profile=name)
+            conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT, "
+                         "email TEXT, age INTEGER)")
+            conn.executemany("INSERT INTO users (name, email, age) VALUES (?, ?, ?)",
+                             [(f"user{i}", f"user{i}@email.com", 18 + i % 80)
+                              for i in range(rows)])
+            conn.commit()
+
+            start = time.perf_counter()
+            for i in range(writes):
+                conn.execute("INSERT INTO users (name, email, age) VALUES (?, ?, ?)",
+                             (f"new{i}", f"new{i}@email.com", 30))
+                conn.commit()
+            write_rate = writes / (time.perf_counter() - start)
+
+            start = time.perf_counter()
+            for i in range(reads):
+                conn.execute("SELECT * FROM users WHERE id = ?", (i % rows + 1,)).fetchone()
+            read_rate = reads / (time.perf_counter() - start)
+
+            start = time.perf_counter()
+            for i in range(scans):
+                conn.execute("SELECT * FROM users WHERE age > ? ORDER BY name LIMIT 100",
+                             (18 + i % 80,)).fetchall()
+            scan_rate = scans / (time.perf_counter() - start)
+            conn.close()
+
+            # What with_db_connection does: connect, one query, close
+            start = time.perf_counter()
+            for i in range(writes):
+                conn = connect(db_path, profile=name)
+                conn.execute("SELECT * FROM users WHERE id = ?", (i % rows + 1,)).fetchone()
+                conn.close()
+            connect_rate = writes / (time.perf_counter() - start)
+            results[name] = {'writes/sec': write_rate, 'reads/sec': read_rate,
+                             'scans/sec': scan_rate, 'opens/sec': connect_rate}
+    finally:
+        shutil.rmtree(directory)
+
+    print(f"{'':<12}{'default':>12}{'tuned':>12}{'speedup':>10}")
+    for metric in results['tuned']:
+        default, tuned = results['default'][metric], results['tuned'][metric]
+        print(f"{metric:<12}{default:>12,.0f}{tuned:>12,.0f}{tuned / default:>9.1f}x")
+    return results
+
+if __name__ == "__main__":
+    benchmark()
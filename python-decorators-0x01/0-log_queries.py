@@ -1,21 +1,154 @@
-import sqlite3
-import functools 
+import functools
+import atexit
+import inspect
+import os
+import random
+import sys
+import threading
+import time
+from collections import deque
 from datetime import datetime
 
-def log_queries(func):
-    @functools.wraps(func)
-    def wrapper(*args, **kwargs):
-        timestamp = datetime.now().strftime("[%Y-%m-%d %H:%M:%S]")
-        if args:
-            print(f"{timestamp} Executed SQL: {args[0]}")
-        elif 'query' in kwargs:
-            print(f"{timestamp} Executed SQL: {kwargs['query']}")
-        return func(*args, **kwargs)
-    return wrapper
+import sqlite_profile
+
+class QueryLog:
+    # In-memory ring buffer of query records, drained by a background thread.
+    # deque.append is atomic, so the hot path takes no lock; when the buffer
+    # is full the oldest unflushed records are dropped.
+    def __init__(self, path=None, capacity=100_000, flush_interval=1.0, sample_rate=1.0):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.flush_interval = flush_interval
+        self.records = deque(maxlen=capacity)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='query-log', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def record(self, query, params, duration_ns, rows, error=None):
+        self.records.append((time.time(), query, params, duration_ns, rows, error))
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        lines = []
+        while True:
+            try:
+                timestamp, query, params, duration_ns, rows, error = self.records.popleft()
+            except IndexError:
+                break
+            when = datetime.fromtimestamp(timestamp).strftime("[%Y-%m-%d %H:%M:%S]")
+            outcome = f"error={error}" if error else f"rows={rows}"
+            lines.append(f"{when} Executed SQL: {query} params={redact(params)} "
+                         f"time={duration_ns / 1e6:.3f}ms {outcome}\n")
+        if not lines:
+            return
+        if self.path:
+            with open(self.path, 'a', encoding='utf-8') as file:
+                file.writelines(lines)
+        else:
+            sys.stdout.writelines(lines)
+            sys.stdout.flush()
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+        self.flush()
+
+def redact(params):
+    # Keep the shape of the bound parameters, never their values
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {name: type(value).__name__ for name, value in params.items()}
+    return tuple(type(value).__name__ for value in params)
+
+default_log = None
+
+def get_default_log():
+    global default_log
+    if default_log is None:
+        default_log = QueryLog()
+    return default_log
+
+def log_queries(func=None, *, log=None, sample_rate=None):
+    # @log_queries or @log_queries(log=QueryLog('queries.log'), sample_rate=0.1)
+    # Works on plain and async functions alike.
+    def decorator(func):
+        def record(active, duration, args, kwargs, result, error=None):
+            query = args[0] if args else kwargs.get('query')
+            params = args[1] if len(args) > 1 else kwargs.get('params')
+            # Only fetchall()-style lists are row sets; a fetchone() tuple is one row
+            rows = len(result) if isinstance(result, list) else None
+            # Parameters are redacted by the flusher, off the hot path. Failed
+            # calls keep only the exception type: messages can quote values.
+            active.record(query, params, duration, rows,
+                          type(error).__name__ if error is not None else None)
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                active = log or get_default_log()
+                rate = active.sample_rate if sample_rate is None else sample_rate
+                if rate < 1.0 and random.random() >= rate:
+                    return await func(*args, **kwargs)
+
+                start = time.perf_counter_ns()
+                try:
+                    result = await func(*args, **kwargs)
+                except BaseException as e:
+                    record(active, time.perf_counter_ns() - start, args, kwargs, None, e)
+                    raise
+                record(active, time.perf_counter_ns() - start, args, kwargs, result)
+                return result
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            active = log or get_default_log()
+            rate = active.sample_rate if sample_rate is None else sample_rate
+            if rate < 1.0 and random.random() >= rate:
+                return func(*args, **kwargs)
+
+            start = time.perf_counter_ns()
+            try:
+                result = func(*args, **kwargs)
+            except BaseException as e:
+                record(active, time.perf_counter_ns() - start, args, kwargs, None, e)
+                raise
+            record(active, time.perf_counter_ns() - start, args, kwargs, result)
+            return result
+        return wrapper
+    if func is not None:
+        return decorator(func)
+    return decorator
+
+def benchmark_overhead(calls=100_000):
+    # Per-call cost of the decorator around a no-op, records going to /dev/null
+    log = QueryLog(os.devnull, flush_interval=0.1)
+
+    def noop(query, params=()):
+        return []
+
+    decorated = log_queries(noop, log=log)
+    sampled = log_queries(noop, log=log, sample_rate=0.01)
+    timings = {}
+    for name, target in (('plain', noop), ('logged', decorated), ('sampled 1%', sampled)):
+        start = time.perf_counter()
+        for _ in range(calls):
+            target("SELECT * FROM users WHERE id = ?", (1,))
+        timings[name] = (time.perf_counter() - start) / calls * 1e6
+    log.close()
+
+    for name, micros in timings.items():
+        print(f"{name:<12} {micros:.2f}us/call (+{micros - timings['plain']:.2f}us)")
+    return timings
 
 @log_queries
 def fetch_all_users(query):
-    conn = sqlite3.connect('users.db')
+    conn = sqlite_profile.connect('users.db')
     cursor = conn.cursor()
     cursor.execute(query)
     results = cursor.fetchall()
@@ -23,7 +156,9 @@ def fetch_all_users(query):
     return results
 
 def setup_database():
-    conn = sqlite3.connect('users.db')
+    # journal_mode lives in the database file, so it is set here once
+    sqlite_profile.configure_database('users.db')
+    conn = sqlite_profile.connect('users.db')
     cursor = conn.cursor()
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS users (
@@ -53,4 +188,7 @@ users = fetch_all_users("SELECT * FROM users")
 
 print("Users:")
 for user in users:
-    print(user)
\ No newline at end of file
+    print(user)
+
+if __name__ == "__main__":
+    benchmark_overhead()
@@ -1,21 +1,214 @@
 import sqlite3
 import functools
+import inspect
+import queue
+import threading
+import time
+
+import sqlite_profile
 
 def with_db_connection(func):
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            async with sqlite_profile.aconnect('users.db') as conn:
+                return await func(conn, *args, **kwargs)
+        return async_wrapper
+
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        conn = sqlite3.connect('users.db')
+        conn = sqlite_profile.connect('users.db')
         try:
             return func(conn, *args, **kwargs)
         finally:
             conn.close()
     return wrapper
 
+class ConnectionPool:
+    # Reuses sqlite3 connections instead of opening one per call.
+    # Checked-out mode: up to max_size connections shared by all threads, each
+    # used by one caller at a time. Thread-affine mode: one connection per
+    # thread, shared by nested calls on that thread and closed once the thread
+    # has exited (max_size does not apply).
+    def __init__(self, db_path='users.db', max_size=5, timeout=30, thread_affine=False):
+        self.db_path = db_path
+        self.max_size = max_size
+        self.timeout = timeout
+        self.thread_affine = thread_affine
+        self._idle = queue.LifoQueue()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._all = []
+        self._owners = {}  # thread-affine mode: connection -> owning thread
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.in_use = 0
+
+    def _connect(self):
+        # check_same_thread is off in both modes: a pooled connection moves
+        # between threads, and a thread-affine one is closed by another thread
+        # once its owner has exited
+        conn = sqlite_profile.connect(self.db_path, check_same_thread=False)
+        with self._lock:
+            self._all.append(conn)
+            self.misses += 1
+        return conn
+
+    def _discard(self, conn):
+        with self._lock:
+            if conn in self._all:
+                self._all.remove(conn)
+            self._owners.pop(conn, None)
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def _close_dead_threads(self):
+        with self._lock:
+            dead = [conn for conn, thread in self._owners.items() if not thread.is_alive()]
+        for conn in dead:
+            self._discard(conn)
+
+    def acquire(self):
+        if self.thread_affine:
+            local = self._local
+            conn = getattr(local, 'conn', None)
+            if conn is None or (not local.depth and conn not in self._owners):
+                # first use on this thread, or closed by close_all()
+                self._close_dead_threads()
+                conn = local.conn = self._connect()
+                local.depth = 0
+                with self._lock:
+                    self._owners[conn] = threading.current_thread()
+            else:
+                with self._lock:
+                    self.hits += 1
+            # Nested calls on this thread share the connection; only the
+            # outermost release ends its transaction
+            local.depth += 1
+            return conn
+
+        try:
+            conn = self._idle.get_nowait()
+            with self._lock:
+                self.hits += 1
+                self.in_use += 1
+            return conn
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_open = len(self._all) < self.max_size
+            if can_open:
+                self.in_use += 1
+        if can_open:
+            try:
+                return self._connect()
+            except Exception:
+                with self._lock:
+                    self.in_use -= 1
+                raise
+
+        start = time.perf_counter()
+        try:
+            conn = self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No connection to {self.db_path} free after {self.timeout}s")
+        with self._lock:
+            self.waits += 1
+            self.wait_time += time.perf_counter() - start
+            self.hits += 1
+            self.in_use += 1
+        return conn
+
+    def release(self, conn):
+        if self.thread_affine:
+            self._local.depth -= 1
+            if self._local.depth:
+                return
+        try:
+            # Like closing a connection, drop anything the caller didn't commit
+            conn.rollback()
+        except sqlite3.Error:
+            # A connection that can't roll back is broken; open a fresh one later
+            self._discard(conn)
+            if self.thread_affine:
+                self._local.conn = None
+            else:
+                with self._lock:
+                    self.in_use -= 1
+            return
+        if not self.thread_affine:
+            with self._lock:
+                self.in_use -= 1
+            self._idle.put(conn)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'db_path': self.db_path,
+                'max_size': self.max_size,
+                'open': len(self._all),
+                'in_use': self.in_use,
+                'idle': self._idle.qsize(),
+                'hits': self.hits,
+                'misses': self.misses,
+                'waits': self.waits,
+                'wait_time': self.wait_time,
+            }
+
+    def close_all(self):
+        with self._lock:
+            conns, self._all = self._all, []
+            self._owners.clear()
+        while True:
+            try:
+                self._idle.get_nowait()
+            except queue.Empty:
+                break
+        for conn in conns:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+default_pool = ConnectionPool('users.db')
+
+def with_pooled_connection(func=None, *, pool=None):
+    # Drop-in replacement for with_db_connection: @with_pooled_connection or
+    # @with_pooled_connection(pool=ConnectionPool('other.db', max_size=10))
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            active = pool or default_pool
+            conn = active.acquire()
+            try:
+                return func(conn, *args, **kwargs)
+            finally:
+                active.release(conn)
+        return wrapper
+    if func is not None:
+        return decorator(func)
+    return decorator
+
 @with_db_connection
-def get_user_by_id(conn, user_id): 
-    cursor = conn.cursor() 
-    cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,)) 
-    return cursor.fetchone() 
+def get_user_by_id(conn, user_id):
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
+    return cursor.fetchone()
+
+@with_pooled_connection
+def get_user_by_id_pooled(conn, user_id):
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
+    return cursor.fetchone()
 
 user = get_user_by_id(user_id=1)
-print(user)
\ No newline at end of file
+print(user)
+
+user = get_user_by_id_pooled(user_id=1)
+print(user)
+print(default_pool.stats())
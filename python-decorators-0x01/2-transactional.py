@@ -1,23 +1,267 @@
 import sqlite3
 import functools
+import atexit
+import inspect
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
 
-def transactional(func):
-    functools.wraps(func)
-    def wrapper(*args, **kwargs):
-        conn = args[0]
-        try:
-            result = func(*args, **kwargs)
-            conn.commit()
+import sqlite_profile
+
+class GroupCommit:
+    # Group commit: one writer thread owns a connection and runs queued
+    # transactional calls in batches, one COMMIT (one fsync) per batch.
+    # A batch takes everything queued while the previous one was committing,
+    # up to max_batch calls; window > 0 also waits that many seconds for more
+    # after the first call. Each call runs inside its own SAVEPOINT, so a
+    # failing call is rolled back alone and only its caller sees the exception.
+    def __init__(self, db_path='users.db', window=0.0, max_batch=100, timeout=30,
+                 connect=sqlite_profile.connect):
+        self.db_path = db_path
+        self.connect = connect
+        self.window = window
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self.queue = queue.Queue()
+        self.batches = 0
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._error = None  # set once the writer thread has stopped
+        self._thread = threading.Thread(target=self._run, name='group-commit', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, func, args, kwargs):
+        future = Future()
+        with self._lock:
+            # Checked under the lock _stop() takes, so nothing is queued
+            # after the writer has drained the queue for the last time
+            if self._error is not None:
+                raise RuntimeError("group commit writer has stopped") from self._error
+            self.queue.put((future, func, args, kwargs))
+        return future
+
+    def call(self, func, args, kwargs):
+        if threading.current_thread() is self._thread:
+            # A grouped function calling another one on the same group:
+            # waiting for the queue from the writer thread would deadlock, so
+            # run it now, inside the caller's savepoint, in a savepoint of its own
+            self._conn.execute("SAVEPOINT nested")
+            try:
+                result = func(self._conn, *args, **kwargs)
+            except BaseException:
+                self._conn.execute("ROLLBACK TO nested")
+                raise
+            finally:
+                self._conn.execute("RELEASE nested")
             return result
-        except Exception:
-            conn.rollback()
-            raise
-    return wrapper
+        return self.submit(func, args, kwargs).result()
+
+    def _collect(self):
+        batch = [self.queue.get()]
+        if batch[0] is None:
+            return None
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self.queue.put(None)  # stop after this batch
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        batch = None
+        error = RuntimeError("group commit is closed")
+        try:
+            # isolation_level=None: transactions and savepoints are managed here
+            conn = self._conn = self.connect(self.db_path, timeout=self.timeout,
+                                             isolation_level=None)
+            try:
+                while True:
+                    batch = self._collect()
+                    if batch is None:
+                        return
+                    self._commit_batch(conn, batch)
+            finally:
+                conn.close()
+        except BaseException as e:
+            error = e
+        finally:
+            self._stop(error, batch)
+
+    def _stop(self, error, batch):
+        # The writer is gone: fail the batch it was running and everything
+        # queued behind it, and make later submit() calls raise
+        with self._lock:
+            self._error = error
+        pending = list(batch or ())
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                pending.append(item)
+        for future, func, args, kwargs in pending:
+            fail(future, error)
+
+    def _commit_batch(self, conn, batch):
+        outcomes = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for future, func, args, kwargs in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                conn.execute("SAVEPOINT call")
+                try:
+                    outcomes.append((future, True, func(conn, *args, **kwargs)))
+                except BaseException as e:
+                    conn.execute("ROLLBACK TO call")
+                    outcomes.append((future, False, e))
+                conn.execute("RELEASE call")
+            conn.execute("COMMIT")
+        except Exception as e:
+            # BEGIN or COMMIT failed: nothing in this batch was written
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for future, func, args, kwargs in batch:
+                fail(future, e)
+            return
+        self.batches += 1
+        self.calls += len(outcomes)
+        for future, ok, value in outcomes:
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+    def close(self):
+        if self._thread.is_alive():
+            self.queue.put(None)
+            self._thread.join()
+
+def fail(future, error):
+    # Resolve a queued or running call with error, unless it is already done
+    # or was cancelled before it started
+    if future.done():
+        return
+    if future.running() or future.set_running_or_notify_cancel():
+        future.set_exception(error)
+
+def transactional(func=None, *, group=None):
+    # @transactional commits or rolls back the connection passed as the first
+    # argument. @transactional(group=GroupCommit('users.db')) instead runs
+    # the function on the group's connection (callers don't pass one) and
+    # commits it together with concurrent calls.
+    def decorator(func):
+        if group is not None:
+            if inspect.iscoroutinefunction(func):
+                raise TypeError("group commit runs functions on its writer thread; "
+                                "use a plain function")
+
+            @functools.wraps(func)
+            def group_wrapper(*args, **kwargs):
+                return group.call(func, args, kwargs)
+            return group_wrapper
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                conn = args[0]
+                try:
+                    result = await func(*args, **kwargs)
+                    await conn.commit()
+                    return result
+                except Exception:
+                    await conn.rollback()
+                    raise
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            conn = args[0]
+            try:
+                result = func(*args, **kwargs)
+                conn.commit()
+                return result
+            except Exception:
+                conn.rollback()
+                raise
+        return wrapper
+    if func is not None:
+        return decorator(func)
+    return decorator
+
+def benchmark_group_commit(writers=8, writes_per_writer=100):
+    # Concurrent single-row updates on a WAL copy of the users table:
+    # one commit per call versus group commit. Both modes use plain sqlite3
+    # connections (synchronous=FULL), so they pay the same fsync cost
+    # whatever the sqlite_profile
+    directory = tempfile.mkdtemp()
+    db_path = os.path.join(directory, 'bench.db')
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT, email TEXT, age INTEGER)")
+    conn.executemany("INSERT INTO users VALUES (?, ?, ?, ?)",
+                     [(i, f"user{i}", f"user{i}@email.com", 30) for i in range(writers)])
+    conn.commit()
+    conn.close()
+
+    def update_email(conn, user_id, new_email):
+        conn.execute("UPDATE users SET email = ? WHERE id = ?", (new_email, user_id))
+
+    single = transactional(update_email)
+
+    def single_writer(user_id):
+        conn = sqlite3.connect(db_path, timeout=30)
+        for n in range(writes_per_writer):
+            single(conn, user_id, f"user{user_id}.{n}@email.com")
+        conn.close()
+
+    group = GroupCommit(db_path, connect=sqlite3.connect)
+    grouped = transactional(update_email, group=group)
+
+    def grouped_writer(user_id):
+        for n in range(writes_per_writer):
+            grouped(user_id, f"user{user_id}.{n}@email.com")
+
+    rates = {}
+    for name, target in (('single commit', single_writer), ('group commit', grouped_writer)):
+        threads = [threading.Thread(target=target, args=(i,)) for i in range(writers)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        rates[name] = writers * writes_per_writer / (time.perf_counter() - start)
+    group.close()
+    shutil.rmtree(directory)
+
+    for name, rate in rates.items():
+        print(f"{name:<14} {rate:>9,.0f} writes/sec")
+    print(f"group commit: {group.calls / group.batches:.1f} writes per commit on average")
+    return rates
 
 def with_db_connection(func):
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            async with sqlite_profile.aconnect('users.db') as conn:
+                return await func(conn, *args, **kwargs)
+        return async_wrapper
+
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        conn = sqlite3.connect('users.db')
+        conn = sqlite_profile.connect('users.db')
         try:
             return func(conn, *args, **kwargs)
         finally:
@@ -31,4 +275,7 @@ def update_user_email(conn, user_id, new_email):
     cursor.execute("UPDATE users SET email = ? WHERE id = ?", (new_email, user_id)) 
 
 
-update_user_email(user_id=1, new_email='Crawford_Cartwright@hotmail.com')
\ No newline at end of file
+update_user_email(user_id=1, new_email='Crawford_Cartwright@hotmail.com')
+
+if __name__ == "__main__":
+    benchmark_group_commit()
@@ -1,32 +1,201 @@
+import asyncio
 import time
 import sqlite3
 import functools
+import inspect
+import random
+import threading
 
-def retry_on_failure(retries=3, delay=1):
+import sqlite_profile
+
+# MySQL error numbers worth retrying: lock wait timeout, deadlock,
+# server has gone away, lost connection during query
+MYSQL_TRANSIENT_ERRNOS = {1205, 1213, 2006, 2013}
+
+# DB-API error modules of mysql-connector, PyMySQL (and aiomysql) and
+# mysqlclient; matched by name so none of them has to be installed
+MYSQL_ERROR_MODULES = {'mysql.connector.errors', 'pymysql.err', 'MySQLdb._exceptions'}
+
+def is_mysql_error(exc):
+    return any(cls.__module__ in MYSQL_ERROR_MODULES for cls in type(exc).__mro__)
+
+def is_transient(exc):
+    # Default classifier: True if the same call may succeed if tried again
+    if isinstance(exc, sqlite3.OperationalError):
+        message = str(exc).lower()
+        return 'locked' in message or 'busy' in message
+    # OSError and friends also carry an errno, in a different numbering
+    if not is_mysql_error(exc):
+        return False
+    errno = getattr(exc, 'errno', None)
+    if errno is None and exc.args and isinstance(exc.args[0], int):
+        errno = exc.args[0]  # PyMySQL keeps the code in args[0]
+    return errno in MYSQL_TRANSIENT_ERRNOS
+
+class RetryBudget:
+    # Token bucket shared by every call using a policy. Each call deposits
+    # `ratio` tokens and each retry spends one, so retries stay at roughly
+    # `ratio` of traffic; once it runs dry, failures are raised immediately
+    # instead of piling more load on a struggling database.
+    def __init__(self, ratio=0.2, capacity=10):
+        self.ratio = ratio
+        self.capacity = capacity
+        self.tokens = capacity
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + self.ratio)
+
+    def withdraw(self):
+        with self._lock:
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+class RetryPolicy:
+    # Exponential backoff with full jitter: attempt n sleeps a random time in
+    # [0, min(max_delay, base_delay * 2**n)], so waiting workers spread out
+    # instead of waking up together. deadline caps the total time spent,
+    # sleeps included.
+    def __init__(self, attempts=3, base_delay=0.05, max_delay=2.0, deadline=None,
+                 classifier=is_transient, budget=None, verbose=False):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.classifier = classifier
+        self.budget = budget
+        self.verbose = verbose
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.retries = 0
+        self.recovered = 0
+        self.failures = 0
+        self.exhausted = 0
+        self.deadline_exceeded = 0
+        self.budget_exhausted = 0
+        self.sleep_time = 0.0
+
+    def backoff(self, attempt):
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def call(self, func, *args, **kwargs):
+        self._count('calls')
+        if self.budget is not None:
+            self.budget.deposit()
+        start = time.monotonic()
+        attempt = 0
+        while True:
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                attempt += 1
+                delay = self.give_up(e, attempt, start)
+                if delay is None:
+                    self._count('failures')
+                    raise
+                if self.verbose:
+                    print(f"Attempt {attempt} failed: {e}. Retrying in {delay:.3f}s...")
+                self._count('retries')
+                self._count('sleep_time', delay)
+                time.sleep(delay)
+            else:
+                if attempt:
+                    self._count('recovered')
+                return result
+
+    async def acall(self, func, *args, **kwargs):
+        # Same as call() for coroutine functions; backs off with asyncio.sleep
+        self._count('calls')
+        if self.budget is not None:
+            self.budget.deposit()
+        start = time.monotonic()
+        attempt = 0
+        while True:
+            try:
+                result = await func(*args, **kwargs)
+            except Exception as e:
+                attempt += 1
+                delay = self.give_up(e, attempt, start)
+                if delay is None:
+                    self._count('failures')
+                    raise
+                if self.verbose:
+                    print(f"Attempt {attempt} failed: {e}. Retrying in {delay:.3f}s...")
+                self._count('retries')
+                self._count('sleep_time', delay)
+                await asyncio.sleep(delay)
+            else:
+                if attempt:
+                    self._count('recovered')
+                return result
+
+    def give_up(self, exc, attempt, start):
+        # Returns how long to sleep before the next attempt, or None to re-raise
+        if not self.classifier(exc):
+            return None
+        if attempt >= self.attempts:
+            self._count('exhausted')
+            return None
+        delay = self.backoff(attempt)
+        if self.deadline is not None and time.monotonic() - start + delay > self.deadline:
+            self._count('deadline_exceeded')
+            return None
+        if self.budget is not None and not self.budget.withdraw():
+            self._count('budget_exhausted')
+            return None
+        return delay
+
+    def stats(self):
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'retries': self.retries,
+                'recovered': self.recovered,
+                'failures': self.failures,
+                'exhausted': self.exhausted,
+                'deadline_exceeded': self.deadline_exceeded,
+                'budget_exhausted': self.budget_exhausted,
+                'sleep_time': self.sleep_time,
+                'budget_tokens': self.budget.tokens if self.budget is not None else None,
+            }
+
+def retry_on_failure(retries=3, delay=1, *, policy=None, **options):
+    # retries is the total number of attempts and delay the base backoff in
+    # seconds, as before. Pass a shared RetryPolicy to pool metrics and
+    # budget across functions, or RetryPolicy keyword arguments directly.
     def decorator(func):
-        @functools.wraps(func)
-        def wrapper(*args, **kwargs):
-            last_exception = None
-            for attempt in range(1, retries + 1):
-                try:
-                    return func(*args, **kwargs)
-                except sqlite3.OperationalError as e:
-                    if "database is locked" in str(e):
-                        print(f"Attempt {attempt} failed: {e}. Retrying in {delay}s...")
-                        last_exception = e
-                        time.sleep(delay)
-                    else:
-                        raise
-            
-            print("All retries failed.")
-            raise last_exception
+        active = policy or RetryPolicy(attempts=retries, base_delay=delay, **options)
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                return await active.acall(func, *args, **kwargs)
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                return active.call(func, *args, **kwargs)
+        wrapper.retry_policy = active
         return wrapper
     return decorator
 
 def with_db_connection(func):
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            async with sqlite_profile.aconnect('users.db') as conn:
+                return await func(conn, *args, **kwargs)
+        return async_wrapper
+
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        conn = sqlite3.connect('users.db')
+        conn = sqlite_profile.connect('users.db')
         try:
             return func(conn, *args, **kwargs)
         finally:
@@ -34,8 +203,7 @@ def with_db_connection(func):
     return wrapper
 
 @with_db_connection
-@retry_on_failure(retries=3, delay=1)
-
+@retry_on_failure(retries=3, delay=1, deadline=10, budget=RetryBudget(), verbose=True)
 def fetch_users_with_retry(conn):
     cursor = conn.cursor()
     cursor.execute("SELECT * FROM users")
@@ -43,4 +211,4 @@ def fetch_users_with_retry(conn):
 
 users = fetch_users_with_retry()
 print(users)
-        
\ No newline at end of file
+print(fetch_users_with_retry.retry_policy.stats())
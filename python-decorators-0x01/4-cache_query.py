@@ -1,26 +1,298 @@
+import asyncio
 import sqlite3
 import functools
+import inspect
+import re
+import sys
+import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import Future
 
-query_cache = {}
+import sqlite_profile
 
-def cache_query(func):
-    @functools.wraps(func)
-    def wrapper(conn, query, *args, **kwargs):
-        cache_key = query
-        if cache_query in query_cache:
-            print(f"[{time.strftime('%H:%M:%S')}] Cache hit for: {cache_key}")
-            return query_cache[cache_key]
-        print(f"[{time.strftime('%H:%M:%S')}] Cache miss for: {cache_key}")
-        result = func(conn, query, *args, **kwargs)
-        query_cache[cache_key] = result
-        return result
-    return wrapper
+TABLE_PATTERN = re.compile(r'\b(?:FROM|JOIN|INTO|UPDATE)\s+["`\[]?(\w+)', re.IGNORECASE)
+
+def tables_in(query):
+    return {name.lower() for name in TABLE_PATTERN.findall(query)}
+
+def result_size(result):
+    # Rough deep size of a fetchall() result: the list, its row tuples and their values
+    size = sys.getsizeof(result)
+    if isinstance(result, (list, tuple)):
+        for row in result:
+            size += sys.getsizeof(row)
+            if isinstance(row, (list, tuple)):
+                size += sum(sys.getsizeof(value) for value in row)
+    return size
+
+# Result a follower sees when the leader gave up without a result of its own
+ABANDONED = object()
+
+class QueryCache:
+    # Thread-safe LRU cache of query results, bounded by entry count and an
+    # approximate memory budget, with per-entry TTLs and per-table invalidation
+    def __init__(self, max_entries=1024, max_bytes=64 * 1024 * 1024, default_ttl=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()  # key -> (result, size, expires_at, tables)
+        self._in_flight = {}
+        self._stale = set()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _begin(self, key):
+        # Returns (hit, leader, value): the cached result on a hit, otherwise
+        # the in-flight Future, which only the leader has to resolve
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[2] is None or entry[2] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, False, entry[0]
+                self._remove(key)
+                self.expirations += 1
+
+            self.misses += 1
+            future = self._in_flight.get(key)
+            if future is None:
+                future = self._in_flight[key] = Future()
+                return False, True, future
+            return False, False, future
+
+    def _fail(self, key, future, error):
+        with self._lock:
+            del self._in_flight[key]
+            self._stale.discard(key)
+        future.set_exception(error)
+
+    def _abandon(self, key, future):
+        # The leader was cancelled or interrupted rather than failing: free the
+        # slot and wake the followers so one of them runs the query instead
+        with self._lock:
+            del self._in_flight[key]
+            self._stale.discard(key)
+        future.set_result(ABANDONED)
+
+    def _finish(self, key, future, query, result, ttl):
+        ttl = self.default_ttl if ttl is None else ttl
+        with self._lock:
+            del self._in_flight[key]
+            # A write may have invalidated the tables while we were loading
+            if key in self._stale:
+                self._stale.discard(key)
+            else:
+                self._store(key, result, query, ttl)
+        future.set_result(result)
+
+    def get_or_load(self, key, query, load, ttl=None):
+        while True:
+            hit, leader, value = self._begin(key)
+            if hit:
+                return value
+            if not leader:
+                # Another caller is already running this query; share its result
+                result = value.result()
+                if result is ABANDONED:
+                    continue
+                return result
+
+            try:
+                result = load()
+            except Exception as e:
+                self._fail(key, value, e)
+                raise
+            except BaseException:
+                self._abandon(key, value)
+                raise
+            self._finish(key, value, query, result, ttl)
+            return result
+
+    async def aget_or_load(self, key, query, load, ttl=None):
+        # get_or_load for coroutines; followers await the leader without
+        # blocking the event loop, whether it is a coroutine or a thread
+        while True:
+            hit, leader, value = self._begin(key)
+            if hit:
+                return value
+            if not leader:
+                # shield: a cancelled follower must not cancel the shared Future
+                result = await asyncio.shield(asyncio.wrap_future(value))
+                if result is ABANDONED:
+                    continue
+                return result
+
+            try:
+                result = await load()
+            except Exception as e:
+                self._fail(key, value, e)
+                raise
+            except BaseException:
+                # CancelledError belongs to the leader's task alone
+                self._abandon(key, value)
+                raise
+            self._finish(key, value, query, result, ttl)
+            return result
+
+    def _store(self, key, result, query, ttl):
+        size = result_size(result)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        expires_at = time.monotonic() + ttl if ttl else None
+        self._entries[key] = (result, size, expires_at, tables_in(query))
+        self.bytes += size
+        while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key):
+        result, size, expires_at, tables = self._entries.pop(key)
+        self.bytes -= size
+
+    def invalidate_tables(self, tables):
+        tables = {table.lower() for table in tables}
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if entry[3] & tables]
+            for key in stale:
+                self._remove(key)
+            self.invalidations += len(stale)
+            # Loads still running may have read the old rows; don't cache them
+            for key in self._in_flight:
+                if tables_in(key[0]) & tables:
+                    self._stale.add(key)
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+            }
+
+query_cache = QueryCache()
+
+def make_key(query, args, kwargs):
+    key = (query, args, tuple(sorted(kwargs.items())))
+    try:
+        hash(key)
+    except TypeError:
+        # e.g. params passed as a list
+        key = (query, repr(args), repr(sorted(kwargs.items())))
+    return key
+
+def cache_query(func=None, *, ttl=None, cache=None):
+    # Caches on the query text plus its parameters. ttl is seconds, or a
+    # callable(query, args) returning seconds (None = no expiry).
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(conn, query, *args, **kwargs):
+                active = cache or query_cache
+                entry_ttl = ttl(query, args) if callable(ttl) else ttl
+                return await active.aget_or_load(
+                    make_key(query, args, kwargs), query,
+                    lambda: func(conn, query, *args, **kwargs), entry_ttl
+                )
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(conn, query, *args, **kwargs):
+            active = cache or query_cache
+            entry_ttl = ttl(query, args) if callable(ttl) else ttl
+            return active.get_or_load(
+                make_key(query, args, kwargs), query,
+                lambda: func(conn, query, *args, **kwargs), entry_ttl
+            )
+        return wrapper
+    if func is not None:
+        return decorator(func)
+    return decorator
+
+WRITE_ACTIONS = {sqlite3.SQLITE_INSERT, sqlite3.SQLITE_UPDATE, sqlite3.SQLITE_DELETE,
+                 sqlite3.SQLITE_DROP_TABLE}
+
+def write_recorder(written):
+    # sqlite3 authorizer that collects the tables a statement writes
+    def authorizer(action, arg1, arg2, db_name, trigger):
+        if action in WRITE_ACTIONS and arg1:
+            written.add(arg1)
+        return sqlite3.SQLITE_OK
+    return authorizer
+
+def transactional(func=None, *, cache=None):
+    # Commit/rollback like 2-transactional.py; after a successful commit the
+    # cached results of every table the transaction wrote are invalidated
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(conn, *args, **kwargs):
+                # conn is an aiosqlite connection
+                written = set()
+                await conn.set_authorizer(write_recorder(written))
+                try:
+                    result = await func(conn, *args, **kwargs)
+                    await conn.commit()
+                except Exception:
+                    await conn.rollback()
+                    raise
+                finally:
+                    await conn.set_authorizer(None)
+                if written:
+                    (cache or query_cache).invalidate_tables(written)
+                return result
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(conn, *args, **kwargs):
+            written = set()
+            conn.set_authorizer(write_recorder(written))
+            try:
+                result = func(conn, *args, **kwargs)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                conn.set_authorizer(None)
+            if written:
+                (cache or query_cache).invalidate_tables(written)
+            return result
+        return wrapper
+    if func is not None:
+        return decorator(func)
+    return decorator
 
 def with_db_connection(func):
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            async with sqlite_profile.aconnect('users.db') as conn:
+                return await func(conn, *args, **kwargs)
+        return async_wrapper
+
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        conn = sqlite3.connect('users.db')
+        conn = sqlite_profile.connect('users.db')
         try:
             return func(conn, *args, **kwargs)
         finally:
@@ -29,16 +301,30 @@ def with_db_connection(func):
 
 @with_db_connection
 @cache_query
-def fetch_users_with_cache(conn, query):
+def fetch_users_with_cache(conn, query, params=()):
     cursor = conn.cursor()
-    cursor.execute(query)
+    cursor.execute(query, params)
     return cursor.fetchall()
 
+@with_db_connection
+@transactional
+def update_user_email(conn, user_id, new_email):
+    cursor = conn.cursor()
+    cursor.execute("UPDATE users SET email = ? WHERE id = ?", (new_email, user_id))
+
 #### First call will cache the result
 users = fetch_users_with_cache(query="SELECT * FROM users")
 
 #### Second call will use the cached result
 users_again = fetch_users_with_cache(query="SELECT * FROM users")
 
+#### Different parameters are cached separately
+older_users = fetch_users_with_cache("SELECT * FROM users WHERE age > ?", (40,))
+
+#### Writing through transactional invalidates everything cached for `users`
+update_user_email(user_id=1, new_email='ika@email.com')
+
 print(users)
-print(users_again)
\ No newline at end of file
+print(users_again)
+print(older_users)
+print(query_cache.stats())
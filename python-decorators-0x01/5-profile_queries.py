@@ -0,0 +1,162 @@
+import sqlite3
+import functools
+import atexit
+import re
+import threading
+import time
+
+import sqlite_profile
+
+LITERALS = [
+    (re.compile(r"'(?:[^']|'')*'"), '?'),           # string literals
+    (re.compile(r'\b0x[0-9a-fA-F]+\b'), '?'),       # hex literals
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),        # numbers
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)'), '(?+)'),  # IN (?, ?, ?)
+    (re.compile(r'\s+'), ' '),
+]
+
+def normalize(query):
+    # Same statement shape -> same key, whatever literals it was written with
+    for pattern, replacement in LITERALS:
+        query = pattern.sub(replacement, query)
+    return query.strip()
+
+class LatencyHistogram:
+    # HDR-style log-linear histogram over nanoseconds: every power of two is
+    # split into 2**SUB_BITS buckets, so recorded values keep ~3% precision
+    SUB_BITS = 5
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def bucket(self, value):
+        shift = max(value.bit_length() - self.SUB_BITS - 1, 0)
+        return (shift, value >> shift)
+
+    def record(self, value):
+        key = self.bucket(value)
+        self.counts[key] = self.counts.get(key, 0) + 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, p):
+        if not self.count:
+            return 0
+        target = p / 100 * self.count
+        seen = 0
+        for shift, top in sorted(self.counts, key=lambda key: key[1] << key[0]):
+            seen += self.counts[(shift, top)]
+            if seen >= target:
+                # middle of the bucket
+                return min((top << shift) + ((1 << shift) >> 1), self.max)
+        return self.max
+
+class QueryProfiler:
+    def __init__(self, slow_threshold_ms=100, report_on_exit=False, top=10):
+        self.slow_threshold_ns = int(slow_threshold_ms * 1e6)
+        self.statements = {}  # normalized SQL -> LatencyHistogram
+        self.plans = {}       # normalized SQL -> EXPLAIN QUERY PLAN rows
+        self._lock = threading.Lock()
+        if report_on_exit:
+            atexit.register(self.report, top)
+
+    def record(self, query, duration_ns, conn=None, params=()):
+        key = normalize(query)
+        with self._lock:
+            histogram = self.statements.get(key)
+            if histogram is None:
+                histogram = self.statements[key] = LatencyHistogram()
+            histogram.record(duration_ns)
+            capture = (duration_ns >= self.slow_threshold_ns and key not in self.plans
+                       and conn is not None)
+            if capture:
+                self.plans[key] = None
+        if capture:
+            self.plans[key] = self.explain(conn, query, params)
+
+    @staticmethod
+    def explain(conn, query, params):
+        try:
+            return conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()
+        except sqlite3.Error as e:
+            return [f"EXPLAIN failed: {e}"]
+
+    def summary(self, top=10, order_by='p99'):
+        with self._lock:
+            rows = [
+                {
+                    'query': query,
+                    'calls': histogram.count,
+                    'total_ms': histogram.total / 1e6,
+                    'p50_ms': histogram.percentile(50) / 1e6,
+                    'p95_ms': histogram.percentile(95) / 1e6,
+                    'p99_ms': histogram.percentile(99) / 1e6,
+                    'max_ms': histogram.max / 1e6,
+                    'plan': self.plans.get(query),
+                }
+                for query, histogram in self.statements.items()
+            ]
+        rows.sort(key=lambda row: row[f'{order_by}_ms'] if order_by != 'calls' else row['calls'],
+                  reverse=True)
+        return rows[:top]
+
+    def report(self, top=10, order_by='p99'):
+        print(f"Top {top} statements by {order_by}:")
+        print(f"{'calls':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}  query")
+        for row in self.summary(top, order_by):
+            print(f"{row['calls']:>7} {row['p50_ms']:>9.3f} {row['p95_ms']:>9.3f} "
+                  f"{row['p99_ms']:>9.3f} {row['max_ms']:>9.3f}  {row['query']}")
+            for step in row['plan'] or ():
+                print(f"{'':>48}plan: {step}")
+
+query_profiler = QueryProfiler()
+
+def profile_queries(func=None, *, profiler=None):
+    # For functions shaped like fetch_users(conn, query, params=())
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(conn, query, *args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return func(conn, query, *args, **kwargs)
+            finally:
+                params = args[0] if args else kwargs.get('params', ())
+                (profiler or query_profiler).record(
+                    query, time.perf_counter_ns() - start, conn, params
+                )
+        return wrapper
+    if func is not None:
+        return decorator(func)
+    return decorator
+
+def with_db_connection(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        conn = sqlite_profile.connect('users.db')
+        try:
+            return func(conn, *args, **kwargs)
+        finally:
+            conn.close()
+    return wrapper
+
+@with_db_connection
+@profile_queries
+def fetch_users(conn, query, params=()):
+    cursor = conn.cursor()
+    cursor.execute(query, params)
+    return cursor.fetchall()
+
+query_profiler.slow_threshold_ns = 0  # capture plans for everything in this demo
+
+for user_id in range(1, 7):
+    fetch_users(f"SELECT * FROM users WHERE id = {user_id}")
+for age in (25, 40, 60):
+    fetch_users("SELECT * FROM users WHERE age > ?", (age,))
+fetch_users("SELECT * FROM users WHERE name IN ('Jane', 'Patrick')")
+
+query_profiler.report(top=5)
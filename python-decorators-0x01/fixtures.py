@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""Shared helpers for the decorator tests."""
+
+import contextlib
+import importlib.util
+import io
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+
+def load_script(filename):
+    """Import a numbered script quietly, from a scratch users.db."""
+    directory = tempfile.mkdtemp()
+    cwd = os.getcwd()
+    os.chdir(directory)
+    try:
+        conn = sqlite3.connect('users.db')
+        conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT, "
+                     "email TEXT, age INTEGER)")
+        conn.execute("INSERT INTO users VALUES (1, 'ika', 'ika@email.com', 30)")
+        conn.commit()
+        conn.close()
+        name = filename[:-3].replace('-', '_')
+        spec = importlib.util.spec_from_file_location(name, os.path.join(HERE, filename))
+        module = importlib.util.module_from_spec(spec)
+        with contextlib.redirect_stdout(io.StringIO()):
+            spec.loader.exec_module(module)
+        return module
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(directory)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""Unit tests for QueryCache in 4-cache_query.py."""
+
+import sqlite3
+import threading
+import time
+import unittest
+
+from fixtures import load_script
+
+
+cache_query = load_script('4-cache_query.py')
+QueryCache = cache_query.QueryCache
+
+QUERY = "SELECT * FROM users WHERE age > ?"
+
+
+def key_for(age):
+    """Cache key for QUERY with the given age parameter."""
+    return cache_query.make_key(QUERY, (age,), {})
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Tests for concurrent misses on the same key."""
+
+    def test_concurrent_identical_misses_load_once(self):
+        """Only one of several concurrent misses runs the query."""
+        cache = QueryCache()
+        release = threading.Event()
+        calls = []
+
+        def load():
+            calls.append(1)
+            release.wait(5)
+            return [(1, 'ika')]
+
+        results = []
+        threads = [threading.Thread(
+            target=lambda: results.append(cache.get_or_load(key_for(40), QUERY, load)))
+            for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        while cache.stats()['misses'] < len(threads):
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [[(1, 'ika')]] * len(threads))
+
+    def test_failed_load_is_not_cached(self):
+        """A failing load raises to its caller and leaves no entry behind."""
+        cache = QueryCache()
+        with self.assertRaises(sqlite3.OperationalError):
+            cache.get_or_load(key_for(40), QUERY, self.fail_load)
+        self.assertEqual(cache.stats()['entries'], 0)
+        self.assertEqual(cache.get_or_load(key_for(40), QUERY, lambda: []), [])
+
+    @staticmethod
+    def fail_load():
+        """Loader that fails like a locked database."""
+        raise sqlite3.OperationalError("database is locked")
+
+
+class TestInvalidation(unittest.TestCase):
+    """Tests for per-table invalidation."""
+
+    def test_invalidation_during_load_is_not_cached(self):
+        """A write during an in-flight load keeps its stale rows out."""
+        cache = QueryCache()
+
+        def load():
+            cache.invalidate_tables({'users'})
+            return [(1, 'old@email.com')]
+
+        self.assertEqual(cache.get_or_load(key_for(40), QUERY, load),
+                         [(1, 'old@email.com')])
+        self.assertEqual(cache.stats()['entries'], 0)
+        self.assertEqual(cache.get_or_load(key_for(40), QUERY, lambda: [(1, 'new')]),
+                         [(1, 'new')])
+
+    def test_invalidation_only_touches_written_tables(self):
+        """Cached results of other tables survive a write."""
+        cache = QueryCache()
+        cache.get_or_load(key_for(40), QUERY, lambda: [(1,)])
+        orders = "SELECT * FROM orders"
+        cache.get_or_load((orders, (), ()), orders, lambda: [(2,)])
+
+        self.assertEqual(cache.invalidate_tables({'USERS'}), 1)
+        self.assertEqual(cache.stats()['entries'], 1)
+
+
+class TestEviction(unittest.TestCase):
+    """Tests for LRU eviction."""
+
+    def test_eviction_respects_byte_budget(self):
+        """Least recently used entries go first to stay under max_bytes."""
+        rows = [(n, f"user{n}") for n in range(50)]
+        size = cache_query.result_size(rows)
+        cache = QueryCache(max_bytes=int(size * 2.5))
+
+        for age in (20, 30):
+            cache.get_or_load(key_for(age), QUERY, lambda: list(rows))
+        cache.get_or_load(key_for(20), QUERY, self.fail_load)  # hit: now most recent
+        cache.get_or_load(key_for(40), QUERY, lambda: list(rows))
+
+        stats = cache.stats()
+        self.assertEqual(stats['evictions'], 1)
+        self.assertEqual(stats['entries'], 2)
+        self.assertLessEqual(stats['bytes'], cache.max_bytes)
+        # Hits first: reloading the evicted key evicts again
+        for age, cached in ((20, True), (40, True), (30, False)):
+            with self.subTest(age=age):
+                loads = []
+                cache.get_or_load(key_for(age), QUERY, lambda: loads.append(1) or rows)
+                self.assertEqual(not loads, cached)
+
+    def test_result_larger_than_budget_is_not_cached(self):
+        """A result that alone exceeds max_bytes is returned but not stored."""
+        cache = QueryCache(max_bytes=64)
+        self.assertEqual(cache.get_or_load(key_for(40), QUERY, lambda: [(1, 'x' * 100)]),
+                         [(1, 'x' * 100)])
+        self.assertEqual(cache.stats()['bytes'], 0)
+
+    @staticmethod
+    def fail_load():
+        """Loader for calls expected to hit the cache."""
+        raise AssertionError("expected a cache hit")
+
+
+if __name__ == '__main__':
+    unittest.main()
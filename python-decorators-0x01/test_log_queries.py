@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Unit tests for log_queries in 0-log_queries.py."""
+
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from fixtures import load_script
+
+log_module = load_script('0-log_queries.py')
+with contextlib.redirect_stdout(io.StringIO()):
+    log_module.default_log.close()  # flush the demo's records now, not mid-test
+
+
+class TestLogQueries(unittest.TestCase):
+    """Tests for the lines written by the query log."""
+
+    def setUp(self):
+        """Create a scratch directory for the logs."""
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Remove the scratch logs."""
+        shutil.rmtree(self.directory)
+
+    def logged(self, func, *args):
+        """Call func through log_queries and return the line it logged."""
+        path = os.path.join(self.directory, f"{len(os.listdir(self.directory))}.log")
+        log = log_module.QueryLog(path, flush_interval=60)
+        with contextlib.suppress(LookupError):
+            log_module.log_queries(func, log=log)(*args)
+        log.close()
+        with open(path, encoding='utf-8') as file:
+            return file.read()
+
+    def test_row_counts(self):
+        """Only list results, as from fetchall(), are counted as rows."""
+        for result, outcome in (([(1,), (2,)], 'rows=2'), ([], 'rows=0'),
+                                ((1, 'ika', 'ika@email.com', 26), 'rows=None'),
+                                (None, 'rows=None')):
+            with self.subTest(result=result):
+                line = self.logged(lambda query, params=(): result,
+                                   "SELECT * FROM users WHERE id = ?", (1,))
+                self.assertIn(outcome, line)
+                self.assertIn("params=('int',)", line)
+
+    def test_failed_call_logs_error_type(self):
+        """A call that raises is logged with its exception type only."""
+        def fail(query, params=()):
+            raise KeyError(f"no user {params[0]}")
+
+        line = self.logged(fail, "SELECT * FROM users WHERE email = ?", ('ika@email.com',))
+        self.assertIn("error=KeyError", line)
+        self.assertNotIn("ika@email.com", line)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Unit tests for sqlite_profile.connect."""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+import warnings
+
+import sqlite_profile
+
+
+class TestConnect(unittest.TestCase):
+    """Tests for connections opened under each profile."""
+
+    def setUp(self):
+        """Create a scratch database with one row."""
+        self.directory = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.directory, 'users.db')
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, email TEXT)")
+        conn.execute("INSERT INTO users VALUES (1, 'ika@email.com')")
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        """Remove the scratch database."""
+        shutil.rmtree(self.directory)
+
+    def test_tuned_connection_is_plain_sqlite3(self):
+        """connect() returns a real sqlite3.Connection with WAL and pragmas."""
+        conn = sqlite_profile.connect(self.db_path, profile='tuned')
+        try:
+            self.assertIsInstance(conn, sqlite3.Connection)
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], 'wal')
+            self.assertEqual(conn.execute("PRAGMA temp_store").fetchone()[0], 2)
+        finally:
+            conn.close()
+
+    def test_close_really_closes(self):
+        """Cursors of a closed connection can't reach a later caller's data."""
+        first = sqlite_profile.connect(self.db_path, profile='tuned')
+        cursor = first.cursor()
+        first.close()
+        with self.assertRaises(sqlite3.ProgrammingError):
+            cursor.execute("SELECT * FROM users")
+
+    def test_settings_do_not_leak_between_callers(self):
+        """isolation_level set by one caller doesn't autocommit the next."""
+        first = sqlite_profile.connect(self.db_path, profile='tuned')
+        first.isolation_level = None
+        first.close()
+
+        second = sqlite_profile.connect(self.db_path, profile='tuned')
+        second.execute("UPDATE users SET email = 'new@email.com' WHERE id = 1")
+        second.close()  # no commit()
+
+        conn = sqlite3.connect(self.db_path)
+        try:
+            self.assertEqual(conn.execute("SELECT email FROM users").fetchone()[0],
+                             'ika@email.com')
+        finally:
+            conn.close()
+
+    def test_profiles_switch_journal_mode(self):
+        """Each profile puts the file in its own journal mode, without warnings."""
+        for name, mode in sqlite_profile.JOURNAL_MODES.items():
+            with self.subTest(profile=name):
+                with warnings.catch_warnings():
+                    warnings.simplefilter('error')
+                    conn = sqlite_profile.connect(self.db_path, profile=name)
+                try:
+                    self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], mode)
+                finally:
+                    conn.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""Unit tests for GroupCommit in 2-transactional.py."""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from fixtures import load_script
+
+
+transactional_module = load_script('2-transactional.py')
+GroupCommit = transactional_module.GroupCommit
+transactional = transactional_module.transactional
+
+
+class TestGroupCommit(unittest.TestCase):
+    """Tests for batching calls into one transaction."""
+
+    def setUp(self):
+        """Create an empty table and a group with a wide batching window."""
+        self.directory = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.directory, 'group.db')
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE entries (value INTEGER)")
+        conn.commit()
+        conn.close()
+        self.group = GroupCommit(self.db_path, window=0.2, connect=sqlite3.connect)
+
+    def tearDown(self):
+        """Stop the writer thread and remove the database."""
+        self.group.close()
+        shutil.rmtree(self.directory)
+
+    def committed(self):
+        """Values visible to a fresh connection, in insertion order."""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return [row[0] for row in conn.execute("SELECT value FROM entries")]
+        finally:
+            conn.close()
+
+    @staticmethod
+    def insert(conn, value):
+        """Insert a value; negative values fail after writing."""
+        conn.execute("INSERT INTO entries VALUES (?)", (value,))
+        if value < 0:
+            raise ValueError(value)
+        return value
+
+    def test_failing_call_is_rolled_back_alone(self):
+        """One failing call in a batch doesn't undo the others."""
+        futures = [self.group.submit(self.insert, (value,), {})
+                   for value in (1, -1, 2)]
+
+        self.assertEqual(futures[0].result(5), 1)
+        self.assertEqual(futures[2].result(5), 2)
+        with self.assertRaises(ValueError):
+            futures[1].result(5)
+        self.assertEqual(self.group.batches, 1)
+        self.assertEqual(self.committed(), [1, 2])
+
+    def test_commit_failure_reaches_every_caller(self):
+        """When COMMIT itself fails, every caller in the batch sees it."""
+        def connect(db_path, **kwargs):
+            conn = sqlite3.connect(db_path, **kwargs)
+            conn.execute("PRAGMA foreign_keys=ON")
+            return conn
+
+        def insert_orphan(conn):
+            # Deferred foreign keys are only checked at COMMIT
+            conn.execute("INSERT INTO children VALUES (42)")
+
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE parents (id INTEGER PRIMARY KEY)")
+        conn.execute("CREATE TABLE children (parent INTEGER REFERENCES parents(id) "
+                     "DEFERRABLE INITIALLY DEFERRED)")
+        conn.commit()
+        conn.close()
+        group = GroupCommit(self.db_path, window=0.2, connect=connect)
+        try:
+            futures = [group.submit(insert_orphan, (), {}),
+                       group.submit(self.insert, (1,), {})]
+            for caller, future in enumerate(futures):
+                with self.subTest(caller=caller):
+                    with self.assertRaises(sqlite3.IntegrityError):
+                        future.result(5)
+        finally:
+            group.close()
+        self.assertEqual(self.committed(), [])
+
+    def test_nested_call_runs_inline(self):
+        """A grouped function calling another one doesn't deadlock."""
+        insert = transactional(self.insert, group=self.group)
+
+        @transactional(group=self.group)
+        def insert_many(conn, values):
+            for value in values:
+                try:
+                    insert(value)
+                except ValueError:
+                    pass
+            return len(values)
+
+        self.assertEqual(insert_many([1, -1, 2]), 3)
+        self.assertEqual(self.committed(), [1, 2])
+
+    def test_base_exception_fails_only_its_caller(self):
+        """A BaseException from one call doesn't kill the writer thread."""
+        class Interrupted(BaseException):
+            """Not an Exception, like SystemExit or GeneratorExit."""
+
+        def interrupt(conn):
+            conn.execute("INSERT INTO entries VALUES (99)")
+            raise Interrupted()
+
+        futures = [self.group.submit(interrupt, (), {}),
+                   self.group.submit(self.insert, (1,), {})]
+        with self.assertRaises(Interrupted):
+            futures[0].result(5)
+        self.assertEqual(futures[1].result(5), 1)
+        self.assertEqual(self.group.submit(self.insert, (2,), {}).result(5), 2)
+        self.assertEqual(self.committed(), [1, 2])
+
+    def test_closed_group_rejects_calls(self):
+        """submit() raises instead of queueing behind a stopped writer."""
+        self.group.close()
+        with self.assertRaises(RuntimeError):
+            self.group.submit(self.insert, (1,), {})
+
+
+class TestWriterFailure(unittest.TestCase):
+    """Tests for a writer thread that can't open its connection."""
+
+    def test_connect_failure_fails_callers(self):
+        """Callers get the connect error instead of blocking forever."""
+        group = GroupCommit('/nonexistent/dir/x.db', window=0.2)
+        insert = transactional(TestGroupCommit.insert, group=group)
+        try:
+            future = group.submit(TestGroupCommit.insert, (1,), {})
+        except RuntimeError as e:
+            self.assertIsInstance(e.__cause__, sqlite3.OperationalError)
+        else:
+            with self.assertRaises(sqlite3.OperationalError):
+                future.result(5)
+
+        group.close()
+        with self.assertRaises(RuntimeError) as cm:
+            insert(2)
+        self.assertIsInstance(cm.exception.__cause__, sqlite3.OperationalError)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""Unit tests for ConnectionPool in 1-with_db_connection.py."""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from fixtures import load_script
+
+with_db_connection = load_script('1-with_db_connection.py')
+ConnectionPool = with_db_connection.ConnectionPool
+
+
+class BrokenRollbackConnection(sqlite3.Connection):
+    """Connection whose rollback() fails once `broken` is set."""
+
+    broken = False
+
+    def rollback(self):
+        """Fail like a connection that lost its file."""
+        if self.broken:
+            raise sqlite3.OperationalError("disk I/O error")
+        super().rollback()
+
+
+class TestConnectionPool(unittest.TestCase):
+    """Tests for borrowing and returning pooled sqlite3 connections."""
+
+    def setUp(self):
+        """Create a scratch database with an empty table."""
+        self.directory = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.directory, 'pool.db')
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE entries (value INTEGER)")
+        conn.commit()
+        conn.close()
+        connect = with_db_connection.sqlite_profile.connect
+        patcher = patch.object(
+            with_db_connection.sqlite_profile, 'connect',
+            lambda *args, **kwargs: connect(*args, factory=BrokenRollbackConnection, **kwargs))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        """Remove the scratch database."""
+        shutil.rmtree(self.directory)
+
+    def committed(self):
+        """Values visible to a fresh connection."""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return [row[0] for row in conn.execute("SELECT value FROM entries")]
+        finally:
+            conn.close()
+
+    def assertClosed(self, conn):
+        """The connection can no longer run statements."""
+        with self.assertRaises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+
+    def test_nested_affine_calls_share_transaction(self):
+        """An inner release on the same thread doesn't roll back the outer call."""
+        pool = ConnectionPool(self.db_path, thread_affine=True)
+        outer = pool.acquire()
+        outer.execute("INSERT INTO entries VALUES (1)")
+        inner = pool.acquire()
+        self.assertIs(inner, outer)
+        inner.execute("INSERT INTO entries VALUES (2)")
+        pool.release(inner)
+
+        outer.commit()
+        pool.release(outer)
+        self.assertEqual(self.committed(), [1, 2])
+        self.assertIs(pool.acquire(), outer)
+        pool.close_all()
+
+    def test_dead_thread_connection_is_closed(self):
+        """A thread-affine connection is closed once its thread has exited."""
+        pool = ConnectionPool(self.db_path, thread_affine=True)
+        held = []
+
+        def work():
+            held.append(pool.acquire())
+            pool.release(held[0])
+
+        thread = threading.Thread(target=work)
+        thread.start()
+        thread.join()
+        conn = pool.acquire()
+        self.assertIsNot(conn, held[0])
+        self.assertClosed(held[0])
+        self.assertEqual(pool.stats()['open'], 1)
+        pool.release(conn)
+        pool.close_all()
+
+    def test_failed_rollback_frees_slot(self):
+        """A connection that can't roll back is discarded and its slot reused."""
+        for affine in (False, True):
+            with self.subTest(thread_affine=affine):
+                pool = ConnectionPool(self.db_path, max_size=1, timeout=0.05,
+                                      thread_affine=affine)
+                conn = pool.acquire()
+                conn.broken = True
+                pool.release(conn)
+
+                stats = pool.stats()
+                self.assertEqual((stats['open'], stats['in_use']), (0, 0))
+                self.assertClosed(conn)
+                fresh = pool.acquire()
+                self.assertIsNot(fresh, conn)
+                pool.release(fresh)
+                pool.close_all()
+
+    def test_timeout_when_exhausted(self):
+        """acquire() raises TimeoutError once max_size connections are out."""
+        pool = ConnectionPool(self.db_path, max_size=1, timeout=0.05)
+        conn = pool.acquire()
+        with self.assertRaises(TimeoutError):
+            pool.acquire()
+        pool.release(conn)
+        self.assertIs(pool.acquire(), conn)
+        self.assertEqual(pool.stats()['hits'], 1)
+        pool.close_all()
+
+    def test_close_all_closes_connections(self):
+        """close_all() closes every connection, idle or checked out."""
+        pool = ConnectionPool(self.db_path, max_size=3)
+        conns = [pool.acquire() for _ in range(3)]
+        for conn in conns[:2]:
+            pool.release(conn)
+        pool.close_all()
+        for conn in conns:
+            self.assertClosed(conn)
+        self.assertEqual(pool.stats()['open'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
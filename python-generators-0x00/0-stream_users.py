@@ -1,24 +1,26 @@
-import mysql.connector
 from mysql.connector import Error
-import os
-from dotenv import load_dotenv
+import seed
+from pool import PoolTimeout
+from filters import compile_query
+from rows import row_builder
 
-load_dotenv()
-
-def stream_users():
+def stream_users(columns=None, where=(), row_factory=None):
+    # row_factory=None yields dicts, tuple yields raw tuples, and a class such
+    # as rows.UserRow is built from each tuple without an intermediate dict
+    query, params, python_filters = compile_query(columns, where)
+    build = row_builder(row_factory, columns)
+    connection = cursor = None
     try:
-        connection = mysql.connector.connect(
-            host='localhost',
-            user=os.getenv('DB_USER'),
-            password=os.getenv('DB_PASSWORD'),
-            database='ALX_prodev'
-        )
-        cursor = connection.cursor(dictionary=True, buffered=False)
-        cursor.execute("SELECT * FROM user_data")
+        connection = seed.get_pool().acquire()
+        cursor = connection.cursor(dictionary=row_factory is None, buffered=False)
+        cursor.execute(query, params)
     
         for row in cursor:
-            yield row
-    except Error as e:
+            if build:
+                row = build(row)
+            if all(keep(row) for keep in python_filters):
+                yield row
+    except (Error, PoolTimeout) as e:
         print(f"❌ Database error: {e}")
     
     finally:
@@ -1,28 +1,30 @@
-import mysql.connector
 from mysql.connector import Error
-import os
-from dotenv import load_dotenv
+import seed
+from pool import PoolTimeout
+from prefetch import prefetch
+from filters import compile_query, apply_filters
 
-load_dotenv()
-
-def stream_users_in_batches(batch_size):
+def stream_users_in_batches(batch_size, columns=None, where=(), raise_errors=False):
+    # raise_errors=True re-raises database errors instead of printing them and
+    # ending the stream early, for callers that can't accept a partial read
+    query, params, python_filters = compile_query(columns, where)
+    connection = cursor = None
     try:
-        connection = mysql.connector.connect(
-            host='localhost',
-            user=os.getenv('DB_USER'),
-            password=os.getenv('DB_PASSWORD'),
-            database='ALX_prodev'
-        )
+        connection = seed.get_pool().acquire()
         cursor = connection.cursor()
-        cursor.execute("SELECT * FROM user_data")
+        cursor.execute(query, params)
         
         while True:
             batch = cursor.fetchmany(batch_size)
             if not batch:
                 break
-            yield batch
+            batch = apply_filters(batch, python_filters)
+            if batch:
+                yield batch
             
-    except Error as e:
+    except (Error, PoolTimeout) as e:
+        if raise_errors:
+            raise
         print(f"❌ Database error: {e}")
         
     finally: 
@@ -30,27 +32,23 @@ def stream_users_in_batches(batch_size):
             cursor.close()
         if connection:
             connection.close()
-            
-for batch in stream_users_in_batches(batch_size=50):
-    print(f"New batch ({len(batch)} rows):")   
-    for row in batch:                        
-        print(row)
-        
-def batch_processing(batch_size):
-    for batch in stream_users_in_batches(batch_size):
+
+def batch_processing(batch_size, read_ahead=2):
+    # The age filter runs in MySQL, so only matching rows cross the wire
+    batches = stream_users_in_batches(batch_size, where=[('age', '>', 25)])
+    if read_ahead:
+        # Fetch the next batches while the current one is being filtered
+        batches = prefetch(batches, read_ahead)
+    for batch in batches:
         for user in batch:
-            age = int(user[3])
-            if age > 25:
-                yield user
+            yield user
     return
 
-for user in batch_processing(batch_size=50):
-    print(user)
-
-        
-        
-        
-        
+if __name__ == "__main__":
+    for batch in stream_users_in_batches(batch_size=50):
+        print(f"New batch ({len(batch)} rows):")
+        for row in batch:
+            print(row)
 
-        
-        
\ No newline at end of file
+    for user in batch_processing(batch_size=50):
+        print(user)
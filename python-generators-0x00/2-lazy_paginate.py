@@ -3,7 +3,7 @@ import seed
 def paginate_users(page_size, offset):
     connection = seed.connect_to_prodev()
     cursor = connection.cursor(dictionary=True)
-    cursor.execute(f"SELECT * FROM user_data LIMIT {page_size} OFFSET {offset}")
+    cursor.execute("SELECT * FROM user_data LIMIT %s OFFSET %s", (page_size, offset))
     rows = cursor.fetchall()
     connection.close()
     return rows
@@ -17,4 +17,38 @@ def lazy_paginate(page_size):
         for row in page:
             yield row
         offset += page_size
-        
+
+def paginate_users_after(connection, page_size, last_user_id=None):
+    # Seek on the primary key instead of skipping `offset` rows, so every
+    # page costs the same index range scan no matter how deep we are
+    cursor = connection.cursor(dictionary=True)
+    if last_user_id is None:
+        cursor.execute(
+            "SELECT * FROM user_data ORDER BY user_id LIMIT %s",
+            (page_size,)
+        )
+    else:
+        cursor.execute(
+            "SELECT * FROM user_data WHERE user_id > %s ORDER BY user_id LIMIT %s",
+            (last_user_id, page_size)
+        )
+    rows = cursor.fetchall()
+    cursor.close()
+    return rows
+
+def lazy_paginate_keyset(page_size, connection=None):
+    own_connection = connection is None
+    if own_connection:
+        connection = seed.connect_to_prodev()
+    try:
+        last_user_id = None
+        while True:
+            page = paginate_users_after(connection, page_size, last_user_id)
+            if not page:
+                break
+            for row in page:
+                yield row
+            last_user_id = page[-1]['user_id']
+    finally:
+        if own_connection:
+            connection.close()
@@ -1,4 +1,5 @@
 import seed
+from aggregates import aggregate_user_data
 
 def stream_user_ages():
         connection = seed.connect_to_prodev()
@@ -11,12 +12,20 @@ def stream_user_ages():
         cursor.close()
         connection.close()
         
-def calculate_average_age():
-    total_age = 0
-    count = 0
-    for age in stream_user_ages():
-        total_age += age
-        count += 1
+def calculate_average_age(pushdown=True):
+    if pushdown:
+        # Let MySQL compute AVG/COUNT instead of shipping every age over the wire
+        connection = seed.connect_to_prodev()
+        result = aggregate_user_data(connection, 'age', stats=('count', 'avg'))
+        connection.close()
+        count = result['count']
+        total_age = result['avg'] * count if count else 0
+    else:
+        total_age = 0
+        count = 0
+        for age in stream_user_ages():
+            total_age += age
+            count += 1
         
     if count > 0:
         average = total_age / count
@@ -25,5 +34,5 @@ def calculate_average_age():
     else:
         print("No users found.")
         
-# if __name__ == '__main__':
-#     calculate_average_age()
\ No newline at end of file
+if __name__ == '__main__':
+    calculate_average_age()
\ No newline at end of file
@@ -0,0 +1,228 @@
+import math
+from array import array
+from bisect import insort
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Numeric user_data columns that may be interpolated into aggregate queries
+NUMERIC_COLUMNS = ('age',)
+
+# Statistics MySQL can compute server-side
+SQL_AGGREGATES = {
+    'count': 'COUNT({column})',
+    'sum': 'SUM({column})',
+    'avg': 'AVG({column})',
+    'min': 'MIN({column})',
+    'max': 'MAX({column})',
+    'variance': 'VAR_POP({column})',
+    'stdev': 'STDDEV_POP({column})',
+}
+
+
+class RunningStats:
+    # Single-pass count/sum/mean/variance (Welford), mergeable per batch (Chan et al.)
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, value):
+        self.count += 1
+        self.total += value
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def update_batch(self, values):
+        if not len(values):
+            return
+        if np is not None:
+            values = np.asarray(values, dtype=np.float64)
+            count = values.size
+            total = float(values.sum())
+            mean = total / count
+            m2 = float(((values - mean) ** 2).sum())
+            low, high = float(values.min()), float(values.max())
+        else:
+            count = len(values)
+            total = math.fsum(values)
+            mean = total / count
+            m2 = math.fsum((value - mean) ** 2 for value in values)
+            low, high = min(values), max(values)
+
+        combined = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / combined
+        self.m2 += m2 + delta * delta * self.count * count / combined
+        self.count = combined
+        self.total += total
+        self.min = min(self.min, low)
+        self.max = max(self.max, high)
+
+    @property
+    def variance(self):
+        return self.m2 / self.count if self.count else None
+
+    @property
+    def stdev(self):
+        return math.sqrt(self.m2 / self.count) if self.count else None
+
+    @property
+    def avg(self):
+        return self.mean if self.count else None
+
+
+class P2Quantile:
+    # Streaming quantile estimate in O(1) memory (Jain & Chlamtac P-square algorithm).
+    # p is a fraction: 0.5 for the median, 0.95 for the 95th percentile.
+    def __init__(self, p):
+        if not 0 < p < 1:
+            raise ValueError(f"Quantile must be a fraction between 0 and 1, not {p!r}")
+        self.p = p
+        self.heights = []
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+        self.increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def update(self, value):
+        q = self.heights
+        if len(q) < 5:
+            insort(q, value)
+            return
+
+        n = self.positions
+        if value < q[0]:
+            q[0] = value
+            k = 0
+        elif value >= q[4]:
+            q[4] = value
+            k = 3
+        else:
+            k = 0
+            while value >= q[k + 1]:
+                k += 1
+
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        for i in (1, 2, 3):
+            d = self.desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                height = self._parabolic(i, d)
+                if not q[i - 1] < height < q[i + 1]:
+                    height = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                q[i] = height
+                n[i] += d
+
+    def _parabolic(self, i, d):
+        q, n = self.heights, self.positions
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    @property
+    def value(self):
+        q = self.heights
+        if not q:
+            return None
+        if len(q) < 5:
+            return q[min(len(q) - 1, int(round(self.p * (len(q) - 1))))]
+        return q[2]
+
+
+def check_column(column):
+    if column not in NUMERIC_COLUMNS:
+        raise ValueError(f"Cannot aggregate column {column!r}")
+
+
+def sql_aggregate(connection, column, stats, bucket_width=None):
+    check_column(column)
+    result = {}
+    cursor = connection.cursor()
+    if stats:
+        selects = ", ".join(SQL_AGGREGATES[stat].format(column=column) for stat in stats)
+        cursor.execute(f"SELECT {selects} FROM user_data")
+        for stat, value in zip(stats, cursor.fetchone()):
+            result[stat] = float(value) if value is not None and stat != 'count' else value
+
+    if bucket_width:
+        cursor.execute(
+            f"SELECT FLOOR({column} / %s) * %s AS bucket, COUNT(*) "
+            f"FROM user_data GROUP BY bucket ORDER BY bucket",
+            (bucket_width, bucket_width)
+        )
+        result['histogram'] = {float(bucket): count for bucket, count in cursor.fetchall()}
+    cursor.close()
+    return result
+
+
+def stream_aggregate(connection, column, stats, bucket_width=None, percentiles=(),
+                     batch_size=10000):
+    check_column(column)
+    running = RunningStats()
+    estimators = {p: P2Quantile(p) for p in percentiles}
+    histogram = {}
+
+    cursor = connection.cursor()
+    cursor.execute(f"SELECT {column} FROM user_data")
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        values = array('d', (row[0] for row in rows))
+        running.update_batch(values)
+
+        for estimator in estimators.values():
+            for value in values:
+                estimator.update(value)
+
+        if bucket_width:
+            if np is not None:
+                buckets, counts = np.unique(
+                    np.floor(np.frombuffer(values, dtype=np.float64) / bucket_width),
+                    return_counts=True
+                )
+                pairs = zip(buckets.tolist(), counts.tolist())
+            else:
+                tally = {}
+                for value in values:
+                    bucket = math.floor(value / bucket_width)
+                    tally[bucket] = tally.get(bucket, 0) + 1
+                pairs = tally.items()
+            for bucket, count in pairs:
+                key = float(bucket * bucket_width)
+                histogram[key] = histogram.get(key, 0) + count
+    cursor.close()
+
+    result = {}
+    for stat in stats:
+        value = running.total if stat == 'sum' else getattr(running, stat)
+        if running.count == 0 and stat in ('min', 'max'):
+            value = None
+        result[stat] = value
+    if bucket_width:
+        result['histogram'] = dict(sorted(histogram.items()))
+    if percentiles:
+        result['percentiles'] = {p: estimator.value for p, estimator in estimators.items()}
+    return result
+
+
+def aggregate_user_data(connection, column='age', stats=('count', 'avg'), bucket_width=None,
+                        percentiles=(), pushdown=True, batch_size=10000):
+    # Push everything MySQL can compute down as SQL aggregates; percentiles
+    # (no PERCENTILE_CONT in MySQL) fall back to a single streaming pass
+    if pushdown and not percentiles:
+        return sql_aggregate(connection, column, stats, bucket_width)
+    return stream_aggregate(connection, column, stats, bucket_width, percentiles, batch_size)
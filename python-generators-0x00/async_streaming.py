@@ -0,0 +1,187 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor, wait
+
+try:
+    import aiomysql
+except ImportError:
+    aiomysql = None
+
+import seed
+from filters import compile_query, apply_filters
+
+# Threads backing the executor adapter when aiomysql is not installed; each
+# concurrent scan only occupies one while a fetch is in flight
+EXECUTOR_WORKERS = 64
+
+_DONE = object()
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(EXECUTOR_WORKERS, thread_name_prefix='astream')
+    return _executor
+
+
+async def aiterate(iterable):
+    # Drive a blocking iterator one step at a time on the executor so the
+    # event loop stays free between database round trips
+    loop = asyncio.get_running_loop()
+    executor = get_executor()
+    iterator = iter(iterable)
+    step = None
+    try:
+        while True:
+            step = executor.submit(next, iterator, _DONE)
+            item = await asyncio.wrap_future(step)
+            if item is _DONE:
+                break
+            yield item
+    finally:
+        close = getattr(iterator, 'close', None)
+        if close:
+            # Runs even if this task is cancelled again while waiting
+            await loop.run_in_executor(executor, close_after, step, close)
+
+
+def close_after(step, close):
+    # A task cancelled mid-fetch leaves its next() running on a worker, and
+    # close() on a generator that is still executing raises ValueError
+    # without running its finally (which returns the connection). Wait for
+    # that step unless it never started.
+    if step is not None and not step.cancel():
+        wait([step])
+    close()
+
+
+async def aconnect(database='ALX_prodev'):
+    seed.load_env()
+    return await aiomysql.connect(
+        host='localhost',
+        user=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD'),
+        db=database
+    )
+
+
+def scan_batches(batch_size, columns=None, where=(), dictionary=False):
+    # Blocking scan behind the executor adapter. Each scan opens its own
+    # connection instead of borrowing from seed.get_pool(), so dozens of
+    # concurrent scans don't queue behind the pool's few connections, and
+    # database errors propagate to the awaiting task instead of being
+    # printed and ending the stream early.
+    query, params, python_filters = compile_query(columns, where)
+    connection = seed.open_connection()
+    try:
+        cursor = connection.cursor(dictionary=dictionary)
+        cursor.execute(query, params)
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                break
+            batch = apply_filters(batch, python_filters)
+            if batch:
+                yield batch
+        cursor.close()
+    finally:
+        connection.close()
+
+
+def keyset_pages(page_size):
+    paginate = __import__('2-lazy_paginate')
+    connection = seed.open_connection()
+    try:
+        yield from batched(paginate.lazy_paginate_keyset(page_size, connection), page_size)
+    finally:
+        connection.close()
+
+
+async def astream_users_in_batches(batch_size, columns=None, where=()):
+    if aiomysql is None:
+        async for batch in aiterate(scan_batches(batch_size, columns, where)):
+            yield batch
+        return
+
+    query, params, python_filters = compile_query(columns, where)
+    connection = await aconnect()
+    try:
+        # SSCursor streams rows from the server instead of buffering the table
+        async with connection.cursor(aiomysql.SSCursor) as cursor:
+            await cursor.execute(query, params)
+            while True:
+                batch = await cursor.fetchmany(batch_size)
+                if not batch:
+                    break
+                batch = apply_filters(list(batch), python_filters)
+                if batch:
+                    yield batch
+    finally:
+        connection.close()
+
+
+async def astream_users(columns=None, where=(), batch_size=1000):
+    if aiomysql is None:
+        async for batch in aiterate(scan_batches(batch_size, columns, where, dictionary=True)):
+            for row in batch:
+                yield row
+        return
+
+    query, params, python_filters = compile_query(columns, where)
+    connection = await aconnect()
+    try:
+        async with connection.cursor(aiomysql.SSDictCursor) as cursor:
+            await cursor.execute(query, params)
+            while True:
+                rows = await cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in apply_filters(list(rows), python_filters):
+                    yield row
+    finally:
+        connection.close()
+
+
+async def alazy_paginate(page_size):
+    # Keyset pagination, the async counterpart of lazy_paginate_keyset
+    if aiomysql is None:
+        async for page in aiterate(keyset_pages(page_size)):
+            for row in page:
+                yield row
+        return
+
+    connection = await aconnect()
+    try:
+        last_user_id = None
+        while True:
+            async with connection.cursor(aiomysql.DictCursor) as cursor:
+                if last_user_id is None:
+                    await cursor.execute(
+                        "SELECT * FROM user_data ORDER BY user_id LIMIT %s", (page_size,)
+                    )
+                else:
+                    await cursor.execute(
+                        "SELECT * FROM user_data WHERE user_id > %s ORDER BY user_id LIMIT %s",
+                        (last_user_id, page_size)
+                    )
+                page = await cursor.fetchall()
+            if not page:
+                break
+            for row in page:
+                yield row
+            last_user_id = page[-1]['user_id']
+    finally:
+        connection.close()
+
+
+def batched(iterable, size):
+    # Group a row iterator so the executor adapter hops threads once per batch
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,344 @@
+import asyncio
+import contextlib
+import os
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from decimal import Decimal
+
+import seed
+import synthetic
+
+# Benchmarks run against a scratch database so ALX_prodev is never truncated
+BENCH_DB = 'ALX_prodev_bench'
+
+# Importing every streaming module must stay under this budget
+IMPORT_BUDGET_MS = 300
+STREAMING_MODULES = (
+    'seed', 'streaming', '0-stream_users', '1-batch_processing',
+    '2-lazy_paginate', '4-stream_ages',
+)
+
+
+def csv_fixture(csv_path):
+    # A plain number means "this many synthetic rows, 1% duplicate emails"
+    if str(csv_path).isdigit():
+        return synthetic.fixture_csv(int(csv_path), duplicate_rate=0.01)
+    return csv_path
+
+
+def bench_connection():
+    connection = seed.connect_db()
+    seed.create_database(connection, BENCH_DB)
+    connection.close()
+
+    connection = seed.connect_to_prodev(BENCH_DB)
+    seed.create_table(connection)
+    return connection
+
+
+def truncate(connection):
+    cursor = connection.cursor()
+    cursor.execute("TRUNCATE TABLE user_data")
+    cursor.close()
+
+
+def timed(func, *args, quiet=False, **kwargs):
+    start = time.perf_counter()
+    if quiet:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            result = func(*args, **kwargs)
+    else:
+        result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def bench_insert(csv_path="user_data.csv", chunk_size=5000):
+    csv_path = csv_fixture(csv_path)
+    connection = bench_connection()
+
+    truncate(connection)
+    per_row, _ = timed(seed.insert_data, connection, csv_path, quiet=True)
+
+    truncate(connection)
+    bulk, (inserted, skipped) = timed(
+        seed.bulk_insert_data, connection, csv_path, int(chunk_size), quiet=True
+    )
+    connection.close()
+
+    print(f"insert_data:      {per_row:.2f}s")
+    print(f"bulk_insert_data: {bulk:.2f}s ({inserted} rows, {skipped} duplicates)")
+    print(f"speedup:          {per_row / bulk:.1f}x")
+
+
+def bench_parallel(csv_path="user_data.csv", max_workers=None):
+    csv_path = csv_fixture(csv_path)
+    connection = bench_connection()
+    max_workers = int(max_workers or os.cpu_count() or 1)
+
+    workers = 1
+    results = []
+    while True:
+        truncate(connection)
+        elapsed, stats = timed(seed.parallel_insert_data, csv_path, workers,
+                               database=BENCH_DB, quiet=True)
+        inserted = sum(stat['inserted'] for stat in stats)
+        results.append((workers, elapsed, inserted / elapsed if elapsed > 0 else 0))
+        if workers >= max_workers:
+            break
+        workers = min(workers * 2, max_workers)
+    connection.close()
+
+    print(f"{'Workers':>7} {'Seconds':>8} {'Rows/sec':>10}")
+    for workers, elapsed, rate in results:
+        print(f"{workers:>7} {elapsed:>8.2f} {rate:>10,.0f}")
+
+
+def bench_pagination(page_size=100, repeat=5):
+    paginate = __import__('2-lazy_paginate')
+    page_size = int(page_size)
+    repeat = int(repeat)
+
+    connection = seed.connect_to_prodev()
+    cursor = connection.cursor()
+    cursor.execute("SELECT COUNT(*) FROM user_data")
+    total = cursor.fetchone()[0]
+
+    depths = [0]
+    while depths[-1] * 10 < total:
+        depths.append(max(depths[-1] * 10, page_size))
+
+    print(f"{'Offset':>10} {'OFFSET ms':>10} {'Keyset ms':>10}")
+    for depth in depths:
+        cursor.execute(
+            "SELECT user_id FROM user_data ORDER BY user_id LIMIT 1 OFFSET %s", (depth,)
+        )
+        row = cursor.fetchone()
+        last_user_id = row[0] if depth and row else None
+
+        offset_time, _ = timed(
+            lambda: [paginate.paginate_users(page_size, depth) for _ in range(repeat)],
+            quiet=True
+        )
+        keyset_time, _ = timed(
+            lambda: [paginate.paginate_users_after(connection, page_size, last_user_id)
+                     for _ in range(repeat)]
+        )
+        print(f"{depth:>10} {offset_time / repeat * 1000:>10.2f} "
+              f"{keyset_time / repeat * 1000:>10.2f}")
+
+    cursor.close()
+    connection.close()
+
+
+def bench_import(budget_ms=IMPORT_BUDGET_MS, repeat=5):
+    # Each run is a fresh interpreter so nothing is served from sys.modules
+    script = (
+        "import importlib, time\n"
+        "start = time.perf_counter()\n"
+        f"for name in {STREAMING_MODULES!r}:\n"
+        "    importlib.import_module(name)\n"
+        "print((time.perf_counter() - start) * 1000)\n"
+    )
+    here = os.path.dirname(os.path.abspath(__file__))
+    timings = []
+    for _ in range(int(repeat)):
+        output = subprocess.run(
+            [sys.executable, "-c", script], cwd=here,
+            capture_output=True, text=True, check=True
+        ).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+
+    best = min(timings)
+    print(f"import time: best {best:.1f}ms, worst {max(timings):.1f}ms "
+          f"(budget {float(budget_ms):.0f}ms)")
+    if best > float(budget_ms):
+        print("❌ Import time is over budget")
+        sys.exit(1)
+
+
+def bench_pool(jobs=16, pool_size=5, pages=20, page_size=100):
+    paginate = __import__('2-lazy_paginate')
+    seed.POOL_OPTIONS['size'] = int(pool_size)
+    pool = seed.get_pool()
+
+    def job():
+        # One pooled connection per page, like paginate_users does
+        last_user_id = None
+        for _ in range(int(pages)):
+            connection = pool.acquire()
+            page = paginate.paginate_users_after(connection, int(page_size), last_user_id)
+            connection.close()
+            if not page:
+                break
+            last_user_id = page[-1]['user_id']
+
+    threads = [threading.Thread(target=job) for _ in range(int(jobs))]
+    elapsed, _ = timed(lambda: ([t.start() for t in threads], [t.join() for t in threads]))
+
+    print(f"{jobs} concurrent jobs on a pool of {pool_size} in {elapsed:.2f}s")
+    for name, value in pool.metrics().items():
+        print(f"  {name:<10} {value:.4f}" if isinstance(value, float) else f"  {name:<10} {value}")
+
+
+def fake_rows(count, seed_value=0):
+    # Synthetic rows shaped like the tuples mysql.connector returns for user_data
+    for user_id, name, email, age in synthetic.generate_rows(count, seed_value):
+        yield user_id, name, email, Decimal(age)
+
+
+def measure(build, count):
+    tracemalloc.start()
+    start = time.perf_counter()
+    data = build(fake_rows(count))
+    build_time = time.perf_counter() - start
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return data, build_time, memory
+
+
+def bench_columnar(rows=1_000_000):
+    import columnar
+    from filters import USER_DATA_COLUMNS
+    count = int(rows)
+
+    modes = {
+        'tuple': (list, lambda data: sum(float(row[3]) for row in data) / len(data)),
+        'dict': (lambda source: [dict(zip(USER_DATA_COLUMNS, row)) for row in source],
+                 lambda data: sum(float(row['age']) for row in data) / len(data)),
+    }
+    backend = columnar.default_backend()
+    if backend == 'arrow':
+        import pyarrow.compute as pc
+        average = lambda data: pc.mean(data.column('age')).as_py()
+    elif backend == 'numpy':
+        average = lambda data: float(data['age'].mean())
+    else:
+        average = lambda data: sum(data['age']) / len(data['age'])
+    modes[f'columnar ({backend})'] = (
+        lambda source: columnar.to_columns(list(source), USER_DATA_COLUMNS, backend), average
+    )
+
+    print(f"{'Mode':<18} {'Memory MB':>10} {'Build s':>8} {'avg(age) ms':>12}")
+    for name, (build, reduce) in modes.items():
+        data, build_time, memory = measure(build, count)
+        reduce_time, _ = timed(reduce, data)
+        print(f"{name:<18} {memory / 1e6:>10.1f} {build_time:>8.2f} {reduce_time * 1000:>12.1f}")
+        del data
+
+
+def bench_async(scans=24, batch_size=1000):
+    import async_streaming
+    batches = __import__('1-batch_processing')
+    scans = int(scans)
+    batch_size = int(batch_size)
+    # The threaded baseline borrows from the shared pool and holds a
+    # connection per scan; the async scans open their own
+    seed.POOL_OPTIONS['size'] = max(seed.POOL_OPTIONS['size'], scans)
+
+    def threaded():
+        counts = [0] * scans
+
+        def scan(i):
+            for batch in batches.stream_users_in_batches(batch_size):
+                counts[i] += len(batch)
+
+        threads = [threading.Thread(target=scan, args=(i,)) for i in range(scans)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return sum(counts)
+
+    async def scan():
+        count = 0
+        async for batch in async_streaming.astream_users_in_batches(batch_size):
+            count += len(batch)
+        return count
+
+    async def concurrent():
+        return sum(await asyncio.gather(*(scan() for _ in range(scans))))
+
+    driver = 'aiomysql' if async_streaming.aiomysql else 'executor adapter'
+    for name, run in (('threads', threaded), (f'asyncio ({driver})', lambda: asyncio.run(concurrent()))):
+        elapsed, rows = timed(run)
+        print(f"{name:<28} {scans} scans, {rows} rows in {elapsed:.2f}s "
+              f"({rows / elapsed if elapsed > 0 else 0:,.0f} rows/sec)")
+
+
+def bench_rows(rows=1_000_000):
+    from filters import USER_DATA_COLUMNS
+    from rows import UserRow
+    count = int(rows)
+
+    modes = {
+        'dict': lambda source: [dict(zip(USER_DATA_COLUMNS, row)) for row in source],
+        'tuple': list,
+        'UserRow': lambda source: [UserRow(*row) for row in source],
+    }
+    print(f"{'Mode':<8} {'Memory MB':>10} {'Bytes/row':>10} {'Build s':>8}")
+    for name, build in modes.items():
+        data, build_time, memory = measure(build, count)
+        print(f"{name:<8} {memory / 1e6:>10.1f} {memory / count:>10.0f} {build_time:>8.2f}")
+        del data
+
+
+def bench_indexes(csv_path="user_data.csv", lookups=1000):
+    csv_path = csv_fixture(csv_path)
+    from filters import compile_query
+    lookups = int(lookups)
+    connection = bench_connection()
+    truncate(connection)
+    timed(seed.bulk_insert_data, connection, csv_path, quiet=True)
+
+    cursor = connection.cursor()
+    cursor.execute("SELECT email FROM user_data ORDER BY RAND() LIMIT %s", (lookups,))
+    emails = [row[0] for row in cursor.fetchall()]
+    age_query, age_params, _ = compile_query(where=[('age', '>', 25)])
+
+    def dedup_lookups():
+        for email in emails:
+            cursor.execute("SELECT * FROM user_data WHERE email = %s", (email,))
+            cursor.fetchall()
+
+    def age_filter():
+        cursor.execute(age_query, age_params)
+        return len(cursor.fetchall())
+
+    results = {}
+    for label, setup in (
+        ('no indexes', lambda: seed.drop_indexes(connection)),
+        ('indexes', lambda: seed.ensure_indexes(connection)),
+        ('indexes + covering', lambda: seed.ensure_indexes(connection, covering=True)),
+    ):
+        timed(setup, quiet=True)
+        print(f"-- {label}")
+        seed.check_generator_queries(connection)
+        results[label] = (timed(dedup_lookups)[0], timed(age_filter)[0])
+
+    cursor.close()
+    connection.close()
+    print(f"{'':<20} {f'{lookups} lookups ms':>16} {'age > 25 ms':>12}")
+    for label, (lookup_time, filter_time) in results.items():
+        print(f"{label:<20} {lookup_time * 1000:>16.1f} {filter_time * 1000:>12.1f}")
+
+
+BENCHMARKS = {
+    'insert': bench_insert,
+    'parallel': bench_parallel,
+    'pagination': bench_pagination,
+    'import': bench_import,
+    'pool': bench_pool,
+    'columnar': bench_columnar,
+    'async': bench_async,
+    'rows': bench_rows,
+    'indexes': bench_indexes,
+}
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in BENCHMARKS:
+        print(f"Usage: python benchmarks.py [{'|'.join(BENCHMARKS)}] [args...]")
+        sys.exit(1)
+    BENCHMARKS[sys.argv[1]](*sys.argv[2:])
@@ -0,0 +1,54 @@
+from datetime import datetime
+
+import seed
+from checkpoint import Checkpoint
+from filters import USER_DATA_COLUMNS
+
+CHANGES_QUERY = f"""
+    SELECT {', '.join(USER_DATA_COLUMNS)}, updated_at FROM user_data
+    WHERE (updated_at > %s OR (updated_at = %s AND user_id > %s))
+      AND updated_at <= %s
+    ORDER BY updated_at, user_id
+    LIMIT %s
+"""
+
+
+def load_watermark(path):
+    state = Checkpoint(path).load()
+    if not state:
+        return datetime(1970, 1, 1), ''
+    return datetime.fromisoformat(state['updated_at']), state['user_id']
+
+
+def save_watermark(path, updated_at, user_id):
+    Checkpoint(path).save({'updated_at': updated_at.isoformat(), 'user_id': user_id})
+
+
+def stream_changes(watermark_path, batch_size=1000, lag_seconds=1):
+    # Yields rows inserted or updated since the saved (updated_at, user_id)
+    # watermark, oldest first. The watermark advances once a whole batch has
+    # been consumed, so an interrupted run replays at most one batch.
+    # Deleted rows are not reported.
+    updated_at, user_id = load_watermark(watermark_path)
+    connection = seed.connect_to_prodev()
+    if connection is None:
+        return
+    try:
+        cursor = connection.cursor(dictionary=True)
+        # Stop slightly behind the server clock so transactions still in
+        # flight can't commit rows behind a watermark we already saved
+        cursor.execute("SELECT NOW(6) - INTERVAL %s SECOND AS upper_bound", (lag_seconds,))
+        upper_bound = cursor.fetchone()['upper_bound']
+
+        while True:
+            cursor.execute(CHANGES_QUERY, (updated_at, updated_at, user_id, upper_bound, batch_size))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            for row in rows:
+                yield row
+            updated_at, user_id = rows[-1]['updated_at'], rows[-1]['user_id']
+            save_watermark(watermark_path, updated_at, user_id)
+        cursor.close()
+    finally:
+        connection.close()
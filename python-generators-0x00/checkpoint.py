@@ -0,0 +1,108 @@
+import json
+import os
+import tempfile
+
+import seed
+
+
+class Checkpoint:
+    # Last acknowledged user_id, persisted atomically to a small JSON file
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        try:
+            with open(self.path, encoding='utf-8') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+
+    def save(self, state):
+        # Write to a temp file in the same directory, then rename over the old
+        # checkpoint, so a crash leaves either the old or the new state
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as file:
+                json.dump(state, file)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def clear(self):
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class Batch:
+    def __init__(self, rows, start_after, ack):
+        self.rows = rows
+        self.start_after = start_after
+        self.last_user_id = rows[-1]['user_id']
+        # Stable across restarts for the same batch_size, so downstream
+        # writers can use it as an idempotency key
+        self.batch_id = f"{start_after or ''}:{self.last_user_id}"
+        self.acked = False
+        self._ack = ack
+
+    def ack(self):
+        if not self.acked:
+            self._ack(self)
+            self.acked = True
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+
+def stream_users_resumable(checkpoint_path, batch_size=1000, save_every=1):
+    # Yields Batch objects starting after the last acknowledged user_id.
+    # Call batch.ack() once the batch is durably processed; the checkpoint is
+    # written every `save_every` acks, and unacknowledged batches are
+    # delivered again after a restart.
+    paginate = __import__('2-lazy_paginate')
+    checkpoint = Checkpoint(checkpoint_path)
+    state = checkpoint.load() or {'last_user_id': None, 'batches': 0}
+    pending = {'acks': 0, 'last_user_id': state['last_user_id']}
+
+    def flush():
+        if pending['last_user_id'] != state['last_user_id']:
+            state['last_user_id'] = pending['last_user_id']
+            state['batches'] += pending['acks']
+            pending['acks'] = 0
+            checkpoint.save(state)
+
+    def ack(batch):
+        # Acks must follow delivery order or the checkpoint would skip a batch
+        if batch.start_after != pending['last_user_id']:
+            raise ValueError(f"Batch {batch.batch_id} acknowledged out of order")
+        pending['last_user_id'] = batch.last_user_id
+        pending['acks'] += 1
+        if pending['acks'] >= save_every:
+            flush()
+
+    connection = seed.connect_to_prodev()
+    if connection is None:
+        return
+    try:
+        start_after = state['last_user_id']
+        while True:
+            rows = paginate.paginate_users_after(connection, batch_size, start_after)
+            if not rows:
+                break
+            batch = Batch(rows, start_after, ack)
+            yield batch
+            if not batch.acked:
+                raise RuntimeError(f"Batch {batch.batch_id} was not acknowledged "
+                                   f"before the next one was requested")
+            start_after = batch.last_user_id
+    finally:
+        flush()
+        connection.close()
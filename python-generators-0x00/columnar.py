@@ -0,0 +1,62 @@
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+from filters import USER_DATA_COLUMNS
+
+# age is DECIMAL with no scale in user_data, so it always fits an int32
+NUMPY_DTYPES = {'age': 'int32'}
+ARROW_TYPES = {'age': 'int32'}
+
+
+def default_backend():
+    if pa is not None:
+        return 'arrow'
+    if np is not None:
+        return 'numpy'
+    return 'python'
+
+
+def to_columns(rows, columns=USER_DATA_COLUMNS, backend='auto'):
+    # Turn a list of row tuples into one array per column
+    if backend == 'auto':
+        backend = default_backend()
+    values = list(zip(*rows)) if rows else [()] * len(columns)
+
+    if backend == 'arrow':
+        arrays = [
+            pa.array([int(v) for v in column], type=getattr(pa, ARROW_TYPES[name])())
+            if name in ARROW_TYPES else pa.array(column, type=pa.string())
+            for name, column in zip(columns, values)
+        ]
+        return pa.RecordBatch.from_arrays(arrays, names=list(columns))
+
+    if backend == 'numpy':
+        return {
+            name: np.fromiter((int(v) for v in column), dtype=NUMPY_DTYPES[name], count=len(column))
+            if name in NUMPY_DTYPES else np.array(column, dtype=object)
+            for name, column in zip(columns, values)
+        }
+
+    if backend == 'python':
+        return {
+            name: array('i', (int(v) for v in column)) if name in NUMPY_DTYPES else list(column)
+            for name, column in zip(columns, values)
+        }
+
+    raise ValueError(f"Unknown columnar backend {backend!r}")
+
+
+def stream_columnar_batches(batch_size, columns=None, where=(), backend='auto'):
+    batches = __import__('1-batch_processing')
+    columns = tuple(columns or USER_DATA_COLUMNS)
+    for batch in batches.stream_users_in_batches(batch_size, columns, where):
+        yield to_columns(batch, columns, backend)
@@ -0,0 +1,217 @@
+import argparse
+import csv
+import io
+import json
+import os
+import queue
+import threading
+import time
+import zlib
+from decimal import Decimal
+
+from columnar import to_columns, pa
+from filters import USER_DATA_COLUMNS
+from prefetch import prefetch
+
+EXTENSIONS = {'csv': '.csv', 'jsonl': '.jsonl', 'parquet': '.parquet'}
+# Codecs CompressedPart can write; parquet compression is checked by pyarrow
+TEXT_COMPRESSIONS = (None, 'gzip')
+
+
+class CompressedPart:
+    # CSV / JSON Lines part file, gzip-compressed incrementally as chunks arrive
+    def __init__(self, path, compression):
+        self.path = path
+        self.file = open(path, 'wb')
+        self.compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compression == 'gzip' else None
+
+    def write(self, data):
+        if self.compressor:
+            data = self.compressor.compress(data)
+        self.file.write(data)
+
+    def close(self):
+        if self.compressor:
+            self.file.write(self.compressor.flush())
+        self.file.close()
+
+
+class ParquetPart:
+    def __init__(self, path, compression):
+        import pyarrow.parquet as pq
+        self.path = path
+        self.writer = None
+        self.open_writer = lambda schema: pq.ParquetWriter(
+            path, schema, compression=compression or 'none'
+        )
+
+    def write(self, record_batch):
+        if self.writer is None:
+            self.writer = self.open_writer(record_batch.schema)
+        self.writer.write_batch(record_batch)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+class WorkerThread:
+    # Runs compression and file writes in order on a background thread; the
+    # bounded queue keeps memory constant if the disk falls behind
+    def __init__(self, depth=4):
+        self.tasks = queue.Queue(maxsize=depth)
+        self.error = None
+        self.thread = threading.Thread(target=self.run, name='export-writer', daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while True:
+            task = self.tasks.get()
+            if task is None:
+                return
+            if self.error is None:
+                try:
+                    task[0](*task[1:])
+                except BaseException as e:
+                    self.error = e
+
+    def submit(self, func, *args):
+        if self.error is not None:
+            raise self.error
+        self.tasks.put((func,) + args)
+
+    def close(self):
+        self.tasks.put(None)
+        self.thread.join()
+        if self.error is not None:
+            raise self.error
+
+
+class Inline:
+    def submit(self, func, *args):
+        func(*args)
+
+    def close(self):
+        pass
+
+
+def json_value(value):
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    return str(value)
+
+
+def encode_csv(batch, header):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(USER_DATA_COLUMNS)
+    writer.writerows(batch)
+    return buffer.getvalue().encode('utf-8')
+
+
+def encode_jsonl(batch):
+    return ''.join(
+        json.dumps(dict(zip(USER_DATA_COLUMNS, row)), default=json_value) + '\n'
+        for row in batch
+    ).encode('utf-8')
+
+
+def export_user_data(path_prefix, fmt='csv', compression='gzip', batch_size=10000,
+                     rows_per_file=1_000_000, threaded=True, where=()):
+    # Streams user_data into numbered part files. Files rotate after
+    # rows_per_file rows, rounded up to a whole batch.
+    if fmt not in EXTENSIONS:
+        raise ValueError(f"Unknown export format {fmt!r}")
+    if fmt == 'parquet' and pa is None:
+        raise RuntimeError("Parquet export needs pyarrow")
+    if fmt != 'parquet' and compression not in TEXT_COMPRESSIONS:
+        raise ValueError(f"{fmt} export supports gzip or no compression, not {compression!r}")
+
+    batches_module = __import__('1-batch_processing')
+    extension = EXTENSIONS[fmt]
+    if fmt != 'parquet' and compression == 'gzip':
+        extension += '.gz'
+    directory = os.path.dirname(path_prefix)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    worker = WorkerThread() if threaded else Inline()
+    part = None
+    files = []
+    rows_in_file = 0
+    total_rows = 0
+    start = time.perf_counter()
+    # Database errors are raised, not printed: a truncated backup must fail
+    batches = prefetch(
+        batches_module.stream_users_in_batches(batch_size, where=where, raise_errors=True)
+    )
+    try:
+        for batch in batches:
+            new_file = part is None or rows_in_file >= rows_per_file
+            if new_file:
+                if part is not None:
+                    worker.submit(part.close)
+                path = f"{path_prefix}-{len(files):05d}{extension}"
+                part = ParquetPart(path, compression) if fmt == 'parquet' else CompressedPart(path, compression)
+                files.append(path)
+                rows_in_file = 0
+
+            if fmt == 'csv':
+                data = encode_csv(batch, header=new_file)
+            elif fmt == 'jsonl':
+                data = encode_jsonl(batch)
+            else:
+                data = to_columns(batch, USER_DATA_COLUMNS, 'arrow')
+            worker.submit(part.write, data)
+
+            rows_in_file += len(batch)
+            total_rows += len(batch)
+
+        if part is not None:
+            worker.submit(part.close)
+            part = None
+        worker.close()
+    except BaseException:
+        # Stop reading, finish or drop pending writes, then delete every part
+        # file of this run rather than leave a truncated export behind
+        batches.close()
+        try:
+            worker.close()
+        except BaseException:
+            pass
+        if part is not None:
+            try:
+                part.close()
+            except Exception:
+                pass
+        for path in files:
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+
+    elapsed = time.perf_counter() - start
+    size = sum(os.path.getsize(path) for path in files)
+    print(f"✅ Exported {total_rows} rows to {len(files)} {fmt} file(s), "
+          f"{size / 1e6:.1f} MB in {elapsed:.2f}s "
+          f"({total_rows / elapsed if elapsed > 0 else 0:,.0f} rows/sec)")
+    return files
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export user_data to compressed files")
+    parser.add_argument('path_prefix', help="e.g. backups/user_data")
+    parser.add_argument('--format', choices=list(EXTENSIONS), default='csv')
+    parser.add_argument('--compression', default='gzip',
+                        help="gzip/none for csv and jsonl; snappy, zstd, gzip or none for parquet")
+    parser.add_argument('--batch-size', type=int, default=10000)
+    parser.add_argument('--rows-per-file', type=int, default=1_000_000)
+    parser.add_argument('--no-thread', action='store_true',
+                        help="compress and write on the main thread")
+    args = parser.parse_args()
+
+    export_user_data(
+        args.path_prefix, args.format,
+        None if args.compression == 'none' else args.compression,
+        args.batch_size, args.rows_per_file, not args.no_thread
+    )
@@ -0,0 +1,55 @@
+USER_DATA_COLUMNS = ('user_id', 'name', 'email', 'age')
+
+SQL_OPERATORS = ('=', '!=', '<', '<=', '>', '>=', 'in', 'like')
+
+
+def check_column(column):
+    if column not in USER_DATA_COLUMNS:
+        raise ValueError(f"Unknown user_data column {column!r}")
+
+
+def compile_query(columns=None, where=()):
+    # Predicates are (column, op, value) tuples, compiled into a bound WHERE
+    # clause, or callables taking a row, which cannot be expressed in SQL and
+    # are returned to be applied in Python instead
+    # Name the columns even for full rows so tuple positions don't shift when
+    # the table grows bookkeeping columns such as updated_at
+    columns = columns or USER_DATA_COLUMNS
+    for column in columns:
+        check_column(column)
+    select = ", ".join(columns)
+
+    clauses = []
+    params = []
+    python_filters = []
+    for predicate in where:
+        if callable(predicate):
+            python_filters.append(predicate)
+            continue
+
+        column, op, value = predicate
+        check_column(column)
+        op = op.lower()
+        if op not in SQL_OPERATORS:
+            raise ValueError(f"Unsupported operator {op!r}")
+        if op == 'in':
+            value = list(value)
+            if not value:
+                clauses.append("FALSE")
+                continue
+            clauses.append(f"{column} IN ({', '.join(['%s'] * len(value))})")
+            params.extend(value)
+        else:
+            clauses.append(f"{column} {op.upper()} %s")
+            params.append(value)
+
+    query = f"SELECT {select} FROM user_data"
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    return query, tuple(params), python_filters
+
+
+def apply_filters(rows, python_filters):
+    if not python_filters:
+        return rows
+    return [row for row in rows if all(keep(row) for keep in python_filters)]
@@ -0,0 +1,120 @@
+import os
+from functools import reduce
+from multiprocessing import Pool
+
+import seed
+from filters import compile_query
+
+# user_id values are uuid4 strings, uniformly spread over their first 8 hex digits
+KEY_SPACE = 16 ** 8
+
+
+def uuid_ranges(partitions):
+    bounds = [None] + [f"{KEY_SPACE * i // partitions:08x}" for i in range(1, partitions)] + [None]
+    return list(zip(bounds, bounds[1:]))
+
+
+def sampled_ranges(connection, partitions):
+    # Exact row-count quantiles for tables whose keys are not uniform uuid4s;
+    # costs one index scan per boundary
+    cursor = connection.cursor()
+    cursor.execute("SELECT COUNT(*) FROM user_data")
+    total = cursor.fetchone()[0]
+    bounds = [None]
+    for i in range(1, partitions):
+        cursor.execute(
+            "SELECT user_id FROM user_data ORDER BY user_id LIMIT 1 OFFSET %s",
+            (total * i // partitions,)
+        )
+        row = cursor.fetchone()
+        if row and row[0] != bounds[-1]:
+            bounds.append(row[0])
+    cursor.close()
+    bounds.append(None)
+    return list(zip(bounds, bounds[1:]))
+
+
+def scan_range(args):
+    # Runs in a worker process; seed's pool keeps one connection per worker
+    low, high, columns, where, map_fn, batch_size, ordered = args
+    where = list(where)
+    if low is not None:
+        where.append(('user_id', '>=', low))
+    if high is not None:
+        where.append(('user_id', '<', high))
+    query, params, _ = compile_query(columns, where)
+    if ordered:
+        query += " ORDER BY user_id"
+
+    connection = seed.connect_to_prodev()
+    if connection is None:
+        raise RuntimeError("Could not connect to ALX_prodev")
+    cursor = connection.cursor()
+    try:
+        cursor.execute(query, params)
+
+        def rows():
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    break
+                yield from batch
+
+        return map_fn(rows())
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def parallel_map(map_fn, workers=None, partitions=None, columns=None, where=(),
+                 ordered=False, batch_size=1000, ranges=None):
+    # Yields map_fn(rows) for every key range. map_fn and any predicates must
+    # be picklable; results come back in key order when ordered=True.
+    if compile_query(columns, where)[2]:
+        raise ValueError("Only (column, op, value) predicates can run in worker processes")
+    workers = workers or os.cpu_count() or 1
+    ranges = ranges or uuid_ranges(partitions or workers * 4)
+    tasks = [(low, high, columns, tuple(where), map_fn, batch_size, ordered)
+             for low, high in ranges]
+
+    with Pool(workers) as pool:
+        results = pool.imap(scan_range, tasks) if ordered else pool.imap_unordered(scan_range, tasks)
+        yield from results
+
+
+def parallel_scan(workers=None, partitions=None, columns=None, where=(), ordered=False,
+                  batch_size=1000):
+    # Merged row iterator over all partitions. Each partition is materialised
+    # in its worker, so use more partitions to bound memory on large tables.
+    for rows in parallel_map(list, workers, partitions, columns, where, ordered, batch_size):
+        yield from rows
+
+
+def parallel_reduce(map_fn, reduce_fn, initial, workers=None, partitions=None, columns=None,
+                    where=(), batch_size=1000):
+    results = parallel_map(map_fn, workers, partitions, columns, where, False, batch_size)
+    return reduce(reduce_fn, results, initial)
+
+
+def sum_and_count(rows):
+    total = 0
+    count = 0
+    for (age,) in rows:
+        total += float(age)
+        count += 1
+    return total, count
+
+
+def add_pairs(left, right):
+    return left[0] + right[0], left[1] + right[1]
+
+
+def parallel_average_age(workers=None, partitions=None):
+    total, count = parallel_reduce(sum_and_count, add_pairs, (0.0, 0), workers, partitions,
+                                   columns=['age'])
+    return total / count if count else None
+
+
+def parallel_batch_processing(workers=None, partitions=None):
+    # batch_processing's age > 25 filter, pushed down into every partition
+    return parallel_scan(workers, partitions, where=[('age', '>', 25)])
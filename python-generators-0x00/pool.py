@@ -0,0 +1,209 @@
+import threading
+import time
+import traceback
+import weakref
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class PooledConnection:
+    # Proxy handed out by ConnectionPool; close() returns the connection to the pool
+    def __init__(self, pool, connection, created_at):
+        self._pool = pool
+        self._connection = connection
+        self.created_at = created_at
+        self.checked_out_at = time.monotonic()
+        self.stack = traceback.format_stack(limit=8)[:-2] if pool.track_stacks else None
+        self.leak_reported = False
+
+    def __getattr__(self, name):
+        if self._connection is None:
+            raise AttributeError(f"Connection already returned to the pool ({name})")
+        return getattr(self._connection, name)
+
+    def close(self):
+        if self._connection is not None:
+            connection, self._connection = self._connection, None
+            self._pool.release(self, connection)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __del__(self):
+        if getattr(self, '_connection', None) is not None:
+            print("⚠️ Pooled connection garbage-collected without close()")
+            connection, self._connection = self._connection, None
+            self._pool.discard(self, connection)
+
+
+class ConnectionPool:
+    def __init__(self, connect, size=5, max_lifetime=1800, timeout=30,
+                 leak_threshold=300, health_check=None, track_stacks=True):
+        self.connect = connect
+        self.size = size
+        self.max_lifetime = max_lifetime
+        self.timeout = timeout
+        self.leak_threshold = leak_threshold
+        self.health_check = health_check or default_health_check
+        self.track_stacks = track_stacks
+
+        self._available = threading.Condition()
+        self._idle = []
+        # Weak, so a borrower that drops its connection without close() lets
+        # PooledConnection.__del__ hand the slot back
+        self._in_use = weakref.WeakSet()
+        self._open = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.discarded = 0
+        self.leaks = 0
+
+    def acquire(self, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        waited = False
+
+        while True:
+            with self._available:
+                if self._idle:
+                    connection, created_at = self._idle.pop()
+                elif self._open < self.size:
+                    self._open += 1
+                    connection = None
+                else:
+                    if not waited:
+                        waited = True
+                        self.waits += 1
+                        self.check_leaks()
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.wait_time += time.monotonic() - start
+                        raise PoolTimeout(f"No connection available after {timeout}s "
+                                          f"({self._open} open, all in use)")
+                    self._available.wait(remaining)
+                    continue
+
+            # Health checks and connects happen outside the lock
+            if connection is not None:
+                if self.usable(connection, created_at):
+                    hit = True
+                    break
+                self.close_quietly(connection)
+                with self._available:
+                    self._open -= 1
+                    self.discarded += 1
+                continue
+
+            try:
+                connection = self.connect()
+            except BaseException:
+                with self._available:
+                    self._open -= 1
+                    self._available.notify()
+                raise
+            created_at = time.monotonic()
+            hit = False
+            break
+
+        pooled = PooledConnection(self, connection, created_at)
+        with self._available:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            if waited:
+                self.wait_time += time.monotonic() - start
+            self._in_use.add(pooled)
+        return pooled
+
+    def usable(self, connection, created_at):
+        if self.max_lifetime and time.monotonic() - created_at > self.max_lifetime:
+            return False
+        try:
+            return self.health_check(connection)
+        except Exception:
+            return False
+
+    def release(self, pooled, connection):
+        try:
+            # End whatever transaction the borrower left open
+            connection.rollback()
+            reusable = not (self.max_lifetime and
+                            time.monotonic() - pooled.created_at > self.max_lifetime)
+        except Exception:
+            reusable = False
+
+        if not reusable:
+            self.discard(pooled, connection)
+            return
+        with self._available:
+            self._in_use.discard(pooled)
+            self._idle.append((connection, pooled.created_at))
+            self._available.notify()
+
+    def discard(self, pooled, connection):
+        self.close_quietly(connection)
+        with self._available:
+            self._in_use.discard(pooled)
+            self._open -= 1
+            self.discarded += 1
+            self._available.notify()
+
+    @staticmethod
+    def close_quietly(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def check_leaks(self):
+        now = time.monotonic()
+        for pooled in list(self._in_use):
+            held = now - pooled.checked_out_at
+            if self.leak_threshold and held > self.leak_threshold and not pooled.leak_reported:
+                pooled.leak_reported = True
+                self.leaks += 1
+                print(f"⚠️ Connection checked out for {held:.1f}s, possible leak")
+                if pooled.stack:
+                    print("".join(pooled.stack), end="")
+
+    def metrics(self):
+        with self._available:
+            self.check_leaks()
+            acquired = self.hits + self.misses
+            return {
+                'size': self.size,
+                'open': self._open,
+                'idle': len(self._idle),
+                'in_use': len(self._in_use),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / acquired if acquired else 0.0,
+                'waits': self.waits,
+                'wait_time': self.wait_time,
+                'avg_wait': self.wait_time / self.waits if self.waits else 0.0,
+                'discarded': self.discarded,
+                'leaks': self.leaks,
+            }
+
+    def close(self):
+        with self._available:
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+        for connection, _ in idle:
+            self.close_quietly(connection)
+
+
+def default_health_check(connection):
+    # mysql.connector's is_connected() pings the server
+    is_connected = getattr(connection, 'is_connected', None)
+    return is_connected() if is_connected else True
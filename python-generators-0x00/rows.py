@@ -0,0 +1,51 @@
+from filters import USER_DATA_COLUMNS
+
+
+class UserRow:
+    # Compact user_data record: no per-instance __dict__, fields by name or position
+    __slots__ = USER_DATA_COLUMNS
+
+    def __init__(self, user_id=None, name=None, email=None, age=None):
+        self.user_id = user_id
+        self.name = name
+        self.email = email
+        self.age = age
+
+    def __getitem__(self, key):
+        # Keeps code written against dict rows (row['user_id']) working
+        if isinstance(key, int):
+            key = USER_DATA_COLUMNS[key]
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key) from None
+
+    def __iter__(self):
+        return (getattr(self, column) for column in USER_DATA_COLUMNS)
+
+    def __eq__(self, other):
+        if not isinstance(other, UserRow):
+            return NotImplemented
+        return tuple(self) == tuple(other)
+
+    def __hash__(self):
+        # Defining __eq__ alone sets __hash__ to None; keep rows usable in sets
+        return hash(tuple(self))
+
+    def __repr__(self):
+        fields = ", ".join(f"{column}={getattr(self, column)!r}" for column in USER_DATA_COLUMNS)
+        return f"UserRow({fields})"
+
+    def asdict(self):
+        return dict(zip(USER_DATA_COLUMNS, self))
+
+
+def row_builder(row_factory, columns=None):
+    # Build rows positionally when the query returns every column in table
+    # order, and by keyword for projections
+    if row_factory is None or row_factory is tuple:
+        return None
+    if not columns or tuple(columns) == USER_DATA_COLUMNS:
+        return lambda row: row_factory(*row)
+    columns = tuple(columns)
+    return lambda row: row_factory(**dict(zip(columns, row)))
@@ -3,46 +3,93 @@ from mysql.connector import Error
 import uuid
 import csv
 import os
+import sys
+import time
+import threading
+from multiprocessing import Pool
+from pool import ConnectionPool, PoolTimeout
 from dotenv import load_dotenv
 
-load_dotenv()
+_env_loaded = False
+
+def load_env():
+    # Read .env on first connect rather than at import time
+    global _env_loaded
+    if not _env_loaded:
+        load_dotenv()
+        _env_loaded = True
+
+# Defaults for every pool created by get_pool(); change before the first connect
+POOL_OPTIONS = {
+    'size': 5,
+    'max_lifetime': 1800,
+    'timeout': 30,
+    'leak_threshold': 300,
+}
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+# A forked worker must never reuse its parent's sockets
+os.register_at_fork(after_in_child=_pools.clear)
+
+def open_connection(database='ALX_prodev'):
+    # A new unpooled connection; errors are raised, not printed
+    load_env()
+    return mysql.connector.connect(
+        host='localhost',
+        user=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD'),
+        database=database
+    )
+
+def get_pool(database='ALX_prodev'):
+    with _pools_lock:
+        pool = _pools.get(database)
+        if pool is None:
+            load_env()
+            options = dict(POOL_OPTIONS)
+            if os.getenv('DB_POOL_SIZE'):
+                options['size'] = int(os.getenv('DB_POOL_SIZE'))
+
+            def connect():
+                return open_connection(database)
+
+            pool = _pools[database] = ConnectionPool(connect, **options)
+        return pool
+
+def pool_metrics():
+    with _pools_lock:
+        pools = dict(_pools)
+    return {database: pool.metrics() for database, pool in pools.items()}
 
 def connect_db():
     try:
-        connection = mysql.connector.connect(
-            host='localhost',
-            user=os.getenv('DB_USER'),
-            password=os.getenv('DB_PASSWORD')
-        )
+        connection = get_pool(None).acquire()
         if connection.is_connected():
             print("✅ Connected to MySQL database")
             return connection
-    except Error as e:
+    except (Error, PoolTimeout) as e:
         print(f"❌ Error connecting to MySQL: {e}")
         return None
     
-def create_database(connection):
+def create_database(connection, database='ALX_prodev'):
     try:
         cursor = connection.cursor()
-        cursor.execute("CREATE DATABASE IF NOT EXISTS ALX_prodev")
-        print("✅ Database 'ALX_prodev' created or already exists")
+        cursor.execute(f"CREATE DATABASE IF NOT EXISTS {database}")
+        print(f"✅ Database '{database}' created or already exists")
         cursor.close()
     except Error as e:
         print(f"❌ Error creating database: {e}")
         
-def connect_to_prodev():
+def connect_to_prodev(database='ALX_prodev'):
     try:
-        connection = mysql.connector.connect(
-            host='localhost',
-            user=os.getenv('DB_USER'),
-            password=os.getenv('DB_PASSWORD'),
-            database='ALX_prodev'
-        )
+        connection = get_pool(database).acquire()
         if connection.is_connected():
-            print("✅ Connected to ALX_prodev database")
+            print(f"✅ Connected to {database} database")
             return connection
-    except Error as e:
-        print(f"❌ Error connecting to ALX_prodev database: {e}")
+    except (Error, PoolTimeout) as e:
+        print(f"❌ Error connecting to {database} database: {e}")
         return None
 
 def create_table(connection):
@@ -53,7 +100,9 @@ def create_table(connection):
             user_id CHAR(36) PRIMARY KEY,
             name VARCHAR(100) NOT NULL,
             email VARCHAR(130) NOT NULL,
-            age DECIMAL NOT NULL
+            age DECIMAL NOT NULL,
+            updated_at TIMESTAMP(6) NOT NULL
+                DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)
         )
         """
         cursor.execute(create_table_query)
@@ -62,7 +111,124 @@ def create_table(connection):
         cursor.close()
     except mysql.connector.Error as e:
         print(f"❌ Error creating table: {e}")
+        return
+    # A table from before updated_at existed needs the column before its index
+    ensure_change_tracking(connection)
+    ensure_indexes(connection)
+
+# Secondary indexes on user_data: name -> (columns, unique)
+INDEXES = {
+    # insert_data's duplicate check and ON DUPLICATE KEY in the bulk loaders
+    'uniq_user_data_email': (('email',), True),
+    # age filters in batch_processing and the aggregates
+    'idx_user_data_age': (('age',), False),
+    # change-capture seeks in changes.stream_changes
+    'idx_user_data_updated_at': (('updated_at', 'user_id'), False),
+}
+
+# Optional: answer `age > N` scans from the index alone, at the cost of a
+# second copy of every row
+COVERING_INDEXES = {
+    'idx_user_data_age_covering': (('age', 'user_id', 'name', 'email'), False),
+}
+
+def existing_indexes(connection):
+    cursor = connection.cursor()
+    cursor.execute("""
+        SELECT DISTINCT index_name FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = 'user_data'
+    """)
+    names = {row[0] for row in cursor}
+    cursor.close()
+    return names
+
+def ensure_indexes(connection, covering=False, names=None):
+    wanted = dict(INDEXES)
+    if covering:
+        wanted.update(COVERING_INDEXES)
+    if names is not None:
+        wanted = {name: wanted[name] for name in names}
+
+    present = existing_indexes(connection)
+    cursor = connection.cursor()
+    for name, (columns, unique) in wanted.items():
+        if name in present:
+            continue
+        kind = "UNIQUE INDEX" if unique else "INDEX"
+        try:
+            cursor.execute(f"CREATE {kind} {name} ON user_data ({', '.join(columns)})")
+            print(f"✅ Created {kind.lower()} {name} ({', '.join(columns)})")
+        except Error as e:
+            # e.g. the unique email index while duplicate emails remain
+            print(f"❌ Error creating index {name}: {e}")
+    cursor.close()
+
+def drop_indexes(connection, names=None):
+    managed = {**INDEXES, **COVERING_INDEXES}
+    present = existing_indexes(connection)
+    cursor = connection.cursor()
+    for name in names or managed:
+        if name in present:
+            cursor.execute(f"DROP INDEX {name} ON user_data")
+            print(f"✅ Dropped index {name}")
+    cursor.close()
+
+def explain(connection, query, params=()):
+    # Returns the EXPLAIN rows and warns when MySQL plans a full table scan
+    cursor = connection.cursor(dictionary=True)
+    cursor.execute(f"EXPLAIN {query}", params)
+    plan = cursor.fetchall()
+    cursor.close()
+    for step in plan:
+        if step['type'] == 'ALL':
+            print(f"⚠️ Full scan of {step['table']} (~{step['rows']} rows): {' '.join(query.split())}")
+    return plan
+
+def check_generator_queries(connection):
+    from filters import compile_query
+    from changes import CHANGES_QUERY
+
+    queries = {
+        'insert_data duplicate check': ("SELECT * FROM user_data WHERE email = %s", ('a@b.c',)),
+        'batch_processing age > 25': compile_query(where=[('age', '>', 25)])[:2],
+        'keyset page': (
+            "SELECT * FROM user_data WHERE user_id > %s ORDER BY user_id LIMIT %s", ('', 100)
+        ),
+        'stream_changes': (
+            CHANGES_QUERY, ('1970-01-01', '1970-01-01', '', '2100-01-01', 1000)
+        ),
+    }
+    full_scans = []
+    for label, (query, params) in queries.items():
+        plan = explain(connection, query, params)
+        access = ", ".join(f"{step['type']}/{step['key'] or '-'}" for step in plan)
+        print(f"{label:<30} {access}")
+        if any(step['type'] == 'ALL' for step in plan):
+            full_scans.append(label)
+    return full_scans
         
+def ensure_change_tracking(connection):
+    # Adds updated_at to a user_data table created before it was part of the schema
+    try:
+        cursor = connection.cursor()
+        cursor.execute("""
+            SELECT COUNT(*) FROM information_schema.columns
+            WHERE table_schema = DATABASE() AND table_name = 'user_data'
+              AND column_name = 'updated_at'
+        """)
+        if cursor.fetchone()[0] == 0:
+            cursor.execute("""
+                ALTER TABLE user_data
+                ADD COLUMN updated_at TIMESTAMP(6) NOT NULL
+                    DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)
+            """)
+            print("✅ Added updated_at change tracking to 'user_data'")
+        cursor.close()
+    except Error as e:
+        print(f"❌ Error adding change tracking: {e}")
+        return
+    ensure_indexes(connection, names=['idx_user_data_updated_at'])
+
 def insert_data(connection, csv_path):
         try:
             cursor = connection.cursor()
@@ -94,9 +260,210 @@ def insert_data(connection, csv_path):
         except Exception as e:
             print(f"❌ Error inserting data: {e}")
 
+
+# Duplicates are already dropped in memory; ON DUPLICATE KEY only covers a
+# row that another writer inserted meanwhile. Unlike INSERT IGNORE it doesn't
+# also turn bad data (an age that isn't a number) into a silent warning.
+INSERT_QUERY = """
+    INSERT INTO user_data (user_id, name, email, age)
+    VALUES (%s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE user_id = user_id
+"""
+
+def existing_emails(connection):
+    cursor = connection.cursor()
+    cursor.execute("SELECT email FROM user_data")
+    emails = {row[0] for row in cursor}
+    cursor.close()
+    return emails
+
+def read_csv_chunks(file, chunk_size):
+    reader = csv.DictReader(file)
+    chunk = []
+    for row in reader:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def insert_chunk(cursor, rows):
+    # executemany rewrites the batch into a single multi-row INSERT. The
+    # no-op update leaves duplicate rows unchanged, so they add 0 to rowcount
+    # (mysql.connector doesn't set CLIENT_FOUND_ROWS by default)
+    cursor.executemany(INSERT_QUERY, rows)
+    return cursor.rowcount
+
+def bulk_insert_data(connection, csv_path, chunk_size=5000):
+    inserted = 0
+    skipped = 0
+    start = time.perf_counter()
+    try:
+        cursor = connection.cursor()
+        # One query for every email already in the table instead of one per CSV row
+        seen = existing_emails(connection)
+        with open(csv_path, mode='r', newline='', encoding='utf-8') as file:
+            for chunk in read_csv_chunks(file, chunk_size):
+                rows = []
+                for row in chunk:
+                    email = row['email']
+                    if email in seen:
+                        skipped += 1
+                        continue
+                    seen.add(email)
+                    rows.append((str(uuid.uuid4()), row['name'], email, row['age']))
+
+                if rows:
+                    count = insert_chunk(cursor, rows)
+                    inserted += count
+                    skipped += len(rows) - count
+                    connection.commit()
+
+        cursor.close()
+    except Exception as e:
+        connection.rollback()
+        print(f"❌ Error bulk inserting data: {e}")
+
+    elapsed = time.perf_counter() - start
+    rate = inserted / elapsed if elapsed > 0 else 0
+    print(f"✅ Inserted {inserted} rows, skipped {skipped} duplicates "
+          f"in {elapsed:.2f}s ({rate:,.0f} rows/sec)")
+    return inserted, skipped
+
+
+def csv_shards(csv_path, workers):
+    # Split the CSV body into byte ranges that start and end on line boundaries.
+    # Assumes no quoted field spans a newline, which holds for user_data.csv.
+    size = os.path.getsize(csv_path)
+    with open(csv_path, mode='rb') as file:
+        header = file.readline().decode('utf-8')
+        bounds = [file.tell()]
+        for i in range(1, workers):
+            file.seek(bounds[0] + (size - bounds[0]) * i // workers)
+            file.readline()
+            bounds.append(max(file.tell(), bounds[-1]))
+        bounds.append(size)
+
+    fieldnames = next(csv.reader([header]))
+    shards = [(start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+    return fieldnames, shards
+
+def read_shard(csv_path, fieldnames, start, end):
+    def lines():
+        with open(csv_path, mode='rb') as file:
+            file.seek(start)
+            position = start
+            for line in file:
+                if position >= end:
+                    break
+                position += len(line)
+                yield line.decode('utf-8')
+
+    return csv.DictReader(lines(), fieldnames=fieldnames)
+
+def shard_emails(args):
+    csv_path, fieldnames, start, end = args
+    return {row['email'] for row in read_shard(csv_path, fieldnames, start, end)}
+
+def load_shard(args):
+    index, csv_path, fieldnames, start, end, skip, chunk_size, database = args
+    inserted = 0
+    skipped = 0
+    begin = time.perf_counter()
+
+    connection = connect_to_prodev(database)
+    if connection is None:
+        return {'worker': index, 'inserted': 0, 'skipped': 0, 'seconds': 0.0}
+
+    try:
+        cursor = connection.cursor()
+        seen = set(skip)
+        rows = []
+        for row in read_shard(csv_path, fieldnames, start, end):
+            email = row['email']
+            if email in seen:
+                skipped += 1
+                continue
+            seen.add(email)
+            rows.append((str(uuid.uuid4()), row['name'], email, row['age']))
+
+            if len(rows) >= chunk_size:
+                count = insert_chunk(cursor, rows)
+                inserted += count
+                skipped += len(rows) - count
+                connection.commit()
+                rows = []
+
+        if rows:
+            count = insert_chunk(cursor, rows)
+            inserted += count
+            skipped += len(rows) - count
+            connection.commit()
+        cursor.close()
+    except Exception as e:
+        connection.rollback()
+        print(f"❌ Worker {index} failed: {e}")
+    finally:
+        connection.close()
+
+    return {'worker': index, 'inserted': inserted, 'skipped': skipped,
+            'seconds': time.perf_counter() - begin}
+
+def parallel_insert_data(csv_path, workers=None, chunk_size=5000, database='ALX_prodev'):
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    fieldnames, shards = csv_shards(csv_path, workers)
+    if not shards:
+        # Header-only or empty CSV: nothing to load, and Pool(0) would raise
+        print("✅ No rows to insert")
+        return []
+
+    connection = connect_to_prodev(database)
+    if connection is None:
+        return []
+    seen = existing_emails(connection)
+    connection.close()
+
+    with Pool(len(shards)) as pool:
+        # Pass 1: collect each shard's emails so duplicates across shards are
+        # resolved the same way insert_data does it -- first row in file order wins
+        shard_sets = pool.map(shard_emails, [
+            (csv_path, fieldnames, begin, end) for begin, end in shards
+        ])
+        skips = []
+        for emails in shard_sets:
+            skips.append(emails & seen)
+            seen |= emails
+        del shard_sets
+
+        # Pass 2: every worker loads its own byte range over its own connection
+        stats = pool.map(load_shard, [
+            (i, csv_path, fieldnames, begin, end, skips[i], chunk_size, database)
+            for i, (begin, end) in enumerate(shards)
+        ])
+
+    elapsed = time.perf_counter() - start
+    print(f"{'Worker':>6} {'Inserted':>10} {'Skipped':>8} {'Seconds':>8} {'Rows/sec':>10}")
+    for stat in stats:
+        rate = stat['inserted'] / stat['seconds'] if stat['seconds'] > 0 else 0
+        print(f"{stat['worker']:>6} {stat['inserted']:>10} {stat['skipped']:>8} "
+              f"{stat['seconds']:>8.2f} {rate:>10,.0f}")
+    inserted = sum(stat['inserted'] for stat in stats)
+    skipped = sum(stat['skipped'] for stat in stats)
+    print(f"✅ {len(stats)} workers inserted {inserted} rows, skipped {skipped} duplicates "
+          f"in {elapsed:.2f}s ({inserted / elapsed if elapsed > 0 else 0:,.0f} rows/sec)")
+    return stats
     
 if __name__ == "__main__":
+    if "--parallel" in sys.argv:
+        parallel_insert_data("user_data.csv")
+        sys.exit(0)
+
     conn = connect_to_prodev()
     if conn:
-        insert_data(conn, "user_data.csv")
+        if "--bulk" in sys.argv:
+            bulk_insert_data(conn, "user_data.csv")
+        else:
+            insert_data(conn, "user_data.csv")
         conn.close()
\ No newline at end of file
@@ -0,0 +1,41 @@
+import importlib
+
+# Public streaming API. The numbered task modules are loaded on first
+# attribute access, so importing this module does no database or file I/O.
+_EXPORTS = {
+    'stream_users': '0-stream_users',
+    'stream_users_in_batches': '1-batch_processing',
+    'batch_processing': '1-batch_processing',
+    'paginate_users': '2-lazy_paginate',
+    'lazy_paginate': '2-lazy_paginate',
+    'paginate_users_after': '2-lazy_paginate',
+    'lazy_paginate_keyset': '2-lazy_paginate',
+    'stream_user_ages': '4-stream_ages',
+    'calculate_average_age': '4-stream_ages',
+    'stream_users_resumable': 'checkpoint',
+    'stream_changes': 'changes',
+    'stream_columnar_batches': 'columnar',
+    'astream_users': 'async_streaming',
+    'astream_users_in_batches': 'async_streaming',
+    'alazy_paginate': 'async_streaming',
+    'parallel_scan': 'parallel_scan',
+    'parallel_map': 'parallel_scan',
+    'parallel_reduce': 'parallel_scan',
+    'aggregate_user_data': 'aggregates',
+    'compile_query': 'filters',
+    'prefetch': 'prefetch',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,132 @@
+import argparse
+import csv
+import os
+import random
+import time
+import uuid
+from itertools import accumulate, islice
+
+import seed
+
+FIRST_NAMES = (
+    'Ama', 'Brian', 'Chloe', 'David', 'Esi', 'Farah', 'George', 'Hana', 'Ikaelelo', 'Jane',
+    'Kofi', 'Lesedi', 'Maria', 'Nia', 'Omar', 'Patrick', 'Qiana', 'Rosa', 'Sipho', 'Thandi',
+)
+LAST_NAMES = (
+    'Adams', 'Banda', 'Chen', 'Dlamini', 'Evans', 'Fofana', 'Garcia', 'Hughes', 'Ito', 'Jones',
+    'Khumalo', 'Lopez', 'Mensah', 'Nkosi', 'Okafor', 'Patel', 'Quinn', 'Rossi', 'Smith', 'Zulu',
+)
+
+MIN_AGE = 18
+MAX_AGE = 100
+
+
+def clamp_age(age):
+    return max(MIN_AGE, min(MAX_AGE, int(round(age))))
+
+
+# Named age distributions; a {age: weight} dict can be passed instead
+AGE_DISTRIBUTIONS = {
+    'uniform': lambda rng: rng.randint(MIN_AGE, MAX_AGE),
+    'normal': lambda rng: clamp_age(rng.gauss(40, 12)),
+    'young': lambda rng: clamp_age(MIN_AGE + rng.expovariate(1 / 10)),
+}
+
+
+def age_sampler(ages):
+    if callable(ages):
+        return ages
+    if isinstance(ages, dict):
+        values = list(ages)
+        cumulative = list(accumulate(ages.values()))
+        return lambda rng: rng.choices(values, cum_weights=cumulative)[0]
+    if ages not in AGE_DISTRIBUTIONS:
+        raise ValueError(f"Unknown age distribution {ages!r}")
+    return AGE_DISTRIBUTIONS[ages]
+
+
+def generate_rows(count, seed_value=0, ages='uniform', duplicate_rate=0.0):
+    # Yields (user_id, name, email, age) tuples; the same arguments always
+    # produce the same rows. With duplicate_rate, that fraction of rows reuses
+    # the email of an earlier row.
+    rng = random.Random(seed_value)
+    sample_age = age_sampler(ages)
+    for i in range(count):
+        if i and duplicate_rate and rng.random() < duplicate_rate:
+            email = f"user{rng.randrange(i)}@example.com"
+        else:
+            email = f"user{i}@example.com"
+        yield (
+            str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            email,
+            sample_age(rng),
+        )
+
+
+def write_csv(path, count, seed_value=0, ages='uniform', duplicate_rate=0.0, chunk_size=100000):
+    # Same layout as user_data.csv, so every loader in seed.py can read it
+    start = time.perf_counter()
+    rows = generate_rows(count, seed_value, ages, duplicate_rate)
+    with open(path, mode='w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(['name', 'email', 'age'])
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            writer.writerows(row[1:] for row in chunk)
+    elapsed = time.perf_counter() - start
+    print(f"✅ Wrote {count} synthetic rows to {path} in {elapsed:.2f}s")
+    return path
+
+
+def insert_rows(connection, count, seed_value=0, ages='uniform', duplicate_rate=0.0,
+                chunk_size=5000):
+    # Straight into user_data; duplicates are dropped by the unique email index
+    inserted = 0
+    start = time.perf_counter()
+    rows = generate_rows(count, seed_value, ages, duplicate_rate)
+    cursor = connection.cursor()
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        inserted += seed.insert_chunk(cursor, chunk)
+        connection.commit()
+    cursor.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ Inserted {inserted} of {count} synthetic rows in {elapsed:.2f}s "
+          f"({inserted / elapsed if elapsed > 0 else 0:,.0f} rows/sec)")
+    return inserted
+
+
+def fixture_csv(rows, seed_value=0, ages='uniform', duplicate_rate=0.0, directory='.'):
+    # Benchmark fixture: generated once per parameter set and reused afterwards
+    path = os.path.join(
+        directory, f"synthetic_{rows}_{seed_value}_{ages}_{duplicate_rate}.csv"
+    )
+    if not os.path.exists(path):
+        write_csv(path, rows, seed_value, ages, duplicate_rate)
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic user_data rows")
+    parser.add_argument('count', type=int)
+    parser.add_argument('--csv', help="write to this CSV file instead of the database")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--ages', choices=list(AGE_DISTRIBUTIONS), default='uniform')
+    parser.add_argument('--duplicate-rate', type=float, default=0.0)
+    parser.add_argument('--database', default='ALX_prodev')
+    args = parser.parse_args()
+
+    if args.csv:
+        write_csv(args.csv, args.count, args.seed, args.ages, args.duplicate_rate)
+    else:
+        conn = seed.connect_to_prodev(args.database)
+        if conn:
+            seed.create_table(conn)
+            insert_rows(conn, args.count, args.seed, args.ages, args.duplicate_rate)
+            conn.close()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""Unit tests for the streaming estimators in aggregates."""
+
+import os
+import random
+import statistics
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from aggregates import P2Quantile  # noqa: E402
+
+
+class TestP2Quantile(unittest.TestCase):
+    """Tests for the P-square percentile estimator."""
+
+    def test_rejects_percent_values(self):
+        """p must be a fraction; 50 or 0 or 1 raise ValueError."""
+        for p in (50, 95, 0, 1, -0.5):
+            with self.subTest(p=p):
+                with self.assertRaises(ValueError):
+                    P2Quantile(p)
+
+    def test_estimates_close_to_exact(self):
+        """Estimates land near the exact quantiles of the stream."""
+        rng = random.Random(42)
+        ages = [rng.randint(18, 100) for _ in range(20000)]
+        exact = statistics.quantiles(ages, n=20)
+        for p, expected in ((0.5, exact[9]), (0.95, exact[18])):
+            with self.subTest(p=p):
+                estimator = P2Quantile(p)
+                for age in ages:
+                    estimator.update(age)
+                self.assertAlmostEqual(estimator.value, expected, delta=2)
+
+    def test_short_streams(self):
+        """Fewer than five values use the sorted values directly."""
+        estimator = P2Quantile(0.5)
+        self.assertIsNone(estimator.value)
+        for age in (40, 20, 60):
+            estimator.update(age)
+        self.assertEqual(estimator.value, 40)
+
+
+if __name__ == '__main__':
+    unittest.main()
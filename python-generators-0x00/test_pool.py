@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""Unit tests for pool.ConnectionPool."""
+
+import contextlib
+import io
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pool import ConnectionPool, PoolTimeout  # noqa: E402
+
+
+class FakeConnection:
+    """Stand-in for a MySQL connection that records how it was used."""
+
+    def __init__(self):
+        """Start healthy, open and unused."""
+        self.rollbacks = 0
+        self.closed = False
+        self.healthy = True
+
+    def rollback(self):
+        """Count the rollback done on release."""
+        self.rollbacks += 1
+
+    def close(self):
+        """Mark the connection closed."""
+        self.closed = True
+
+    def is_connected(self):
+        """Health check used by default_health_check."""
+        return self.healthy
+
+
+class TestConnectionPool(unittest.TestCase):
+    """Tests for borrowing and returning pooled connections."""
+
+    def test_release_reuses_connection(self):
+        """A returned connection is rolled back and handed out again."""
+        pool = ConnectionPool(FakeConnection, size=1)
+        with pool.acquire() as first:
+            raw = first._connection
+        with pool.acquire() as second:
+            self.assertIs(second._connection, raw)
+        self.assertEqual(raw.rollbacks, 2)
+        metrics = pool.metrics()
+        self.assertEqual((metrics['hits'], metrics['misses']), (1, 1))
+        self.assertEqual((metrics['idle'], metrics['in_use']), (1, 0))
+
+    def test_unhealthy_connection_is_replaced(self):
+        """A connection failing its health check is closed, not reused."""
+        pool = ConnectionPool(FakeConnection, size=1)
+        with pool.acquire() as first:
+            raw = first._connection
+        raw.healthy = False
+        with pool.acquire() as second:
+            self.assertIsNot(second._connection, raw)
+        self.assertTrue(raw.closed)
+        self.assertEqual(pool.metrics()['discarded'], 1)
+
+    def test_timeout_when_exhausted(self):
+        """acquire() raises PoolTimeout once every connection is in use."""
+        pool = ConnectionPool(FakeConnection, size=2, timeout=0.05)
+        held = [pool.acquire(), pool.acquire()]
+        start = time.monotonic()
+        with self.assertRaises(PoolTimeout):
+            pool.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+        metrics = pool.metrics()
+        self.assertEqual(metrics['waits'], 1)
+        self.assertEqual(metrics['open'], 2)
+        for pooled in held:
+            pooled.close()
+
+    def test_waiter_gets_released_connection(self):
+        """A waiting acquire() wakes up when another thread releases."""
+        pool = ConnectionPool(FakeConnection, size=1, timeout=5)
+        held = pool.acquire()
+        threading.Timer(0.05, held.close).start()
+        with pool.acquire() as pooled:
+            self.assertIsNotNone(pooled._connection)
+        self.assertGreater(pool.metrics()['wait_time'], 0)
+
+    def test_failed_connect_frees_slot(self):
+        """A connect() that raises doesn't count against the pool size."""
+        attempts = []
+
+        def connect():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise ConnectionError("server unavailable")
+            return FakeConnection()
+
+        pool = ConnectionPool(connect, size=1, timeout=0.05)
+        with self.assertRaises(ConnectionError):
+            pool.acquire()
+        with pool.acquire():
+            self.assertEqual(pool.metrics()['open'], 1)
+
+    def test_leak_reported_once(self):
+        """A connection held past leak_threshold is reported once."""
+        for checker in ('metrics', 'acquire'):
+            with self.subTest(checker=checker):
+                pool = ConnectionPool(FakeConnection, size=1, timeout=0.01,
+                                      leak_threshold=0.01)
+                held = pool.acquire()
+                time.sleep(0.02)
+                output = io.StringIO()
+                with contextlib.redirect_stdout(output):
+                    for _ in range(2):
+                        if checker == 'metrics':
+                            pool.metrics()
+                        else:
+                            with contextlib.suppress(PoolTimeout):
+                                pool.acquire()
+                self.assertEqual(pool.leaks, 1)
+                self.assertEqual(output.getvalue().count("possible leak"), 1)
+                self.assertIn("test_leak_reported_once", output.getvalue())
+                held.close()
+
+    def test_dropped_connection_returns_slot(self):
+        """Losing a connection without close() gives its slot back."""
+        pool = ConnectionPool(FakeConnection, size=1, timeout=0.05)
+        with contextlib.redirect_stdout(io.StringIO()):
+            pool.acquire()  # dropped straight away
+        with pool.acquire():
+            metrics = pool.metrics()
+        self.assertEqual(metrics['discarded'], 1)
+        self.assertEqual(metrics['open'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()